@@ -0,0 +1,137 @@
+"""Disk-backed cache of OpenAI classification results.
+
+Exact hits are keyed by normalized title + URL + page text, under the model
+and topic filters. An optional semantic layer matches new titles against
+cached ones by embedding cosine similarity and lends them only the cached
+relevance decision, never extracted fields. It skips rows for the same
+URL, whose page changed since its relevance was judged.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import time
+from array import array
+from operator import mul
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    from json import loads as json_loads
+
+from normalize import normalize_title
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(SCRIPT_DIR, "classify_cache.sqlite")
+
+SEMANTIC_THRESHOLD = 0.92
+
+# Lazy-initialized connection
+_conn = None
+
+
+def _get_conn():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(CACHE_PATH)
+        # WAL keeps reads from blocking on the per-result commits
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS classifications ("
+            "key TEXT PRIMARY KEY, scope TEXT, embedding BLOB, payload TEXT, ts REAL, "
+            "url TEXT)"
+        )
+        columns = {row[1] for row in _conn.execute("PRAGMA table_info(classifications)")}
+        if "url" not in columns:  # caches written before rows recorded their URL
+            _conn.execute("ALTER TABLE classifications ADD COLUMN url TEXT")
+    return _conn
+
+
+def filter_scope(include_topics, exclude_topics, model=""):
+    """Return the cache scope for a model and set of topic filters.
+
+    Relevance depends on the filters, and answers on the model, so results
+    are only reused for the same model and include/exclude topics.
+    """
+    return f"{model}|{include_topics or ''}|{exclude_topics or ''}"
+
+
+def make_key(title, url, scope="", page_text=""):
+    """Exact-match cache key for a conference under a filter scope.
+
+    The page text is part of the key, so an edited page (e.g. an extended
+    deadline) is classified again instead of served stale.
+    """
+    digest = hashlib.md5(page_text.encode()).hexdigest()
+    raw = f"{normalize_title(title)}|{url}|{scope}|{digest}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def get(key):
+    """Return the cached payload for key, or None."""
+    row = _get_conn().execute(
+        "SELECT payload FROM classifications WHERE key = ?", (key,)
+    ).fetchone()
+    return json_loads(row[0]) if row else None
+
+
+def load_embeddings(scope):
+    """Load the title embeddings cached under scope, for get_similar.
+
+    Each row is (url, vector, norm, payload JSON). Loading once per run, with
+    the norms precomputed, keeps each semantic lookup to one dot product
+    per row instead of a full re-read and two norms. Rows cached before
+    URLs were recorded are left out, as get_similar could not tell whether
+    they belong to the conference being looked up.
+    """
+    rows = _get_conn().execute(
+        "SELECT url, embedding, payload FROM classifications "
+        "WHERE scope = ? AND embedding IS NOT NULL AND url IS NOT NULL",
+        (scope,),
+    )
+    index = []
+    for url, blob, payload in rows:
+        vector = array("f", blob)
+        index.append((url, vector, _norm(vector), payload))
+    return index
+
+
+def get_similar(embedding, index, url=None, threshold=SEMANTIC_THRESHOLD):
+    """Return the payload whose title embedding is closest to embedding.
+
+    index comes from load_embeddings, so only rows in that filter scope
+    are considered, and only a match with cosine similarity of at least
+    threshold is returned. Callers reuse only its relevance decision.
+    Rows for url itself are skipped: an exact-key miss on a known URL
+    means its page changed, so its old relevance decision is judged
+    again rather than reused.
+    """
+    norm = _norm(embedding)
+    if not norm:
+        return None
+    best_score, best_payload = threshold, None
+    for row_url, vector, row_norm, payload in index:
+        if not row_norm or (url and row_url == url):
+            continue
+        score = sum(map(mul, embedding, vector)) / (norm * row_norm)
+        if score >= best_score:
+            best_score, best_payload = score, payload
+    return json_loads(best_payload) if best_payload else None
+
+
+def put(key, payload, scope="", embedding=None, url=None):
+    """Store payload under key, with an optional title embedding and URL."""
+    blob = array("f", embedding).tobytes() if embedding else None
+    conn = _get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO classifications (key, scope, embedding, payload, ts, url) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (key, scope, blob, json.dumps(payload), time.time(), url),
+    )
+    conn.commit()
+
+
+def _norm(vector):
+    return math.sqrt(sum(map(mul, vector, vector)))
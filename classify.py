@@ -1,128 +1,748 @@
 """OpenAI-based conference classification and info extraction."""
 
+import asyncio
 import json
-import re
+import logging
 import os
-from openai import OpenAI
+import re
+import time
+from openai import AsyncOpenAI, BadRequestError
 from dotenv import load_dotenv
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    from json import loads as json_loads
+
+import cache
+
+log = logging.getLogger(__name__)
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # Load environment variables from .env if it exists, otherwise rely on shell env
 load_dotenv(os.path.join(SCRIPT_DIR, ".env"), override=False)
 
-# Lazy-initialized client
+EMBEDDING_MODEL = "text-embedding-3-small"
+DEFAULT_MAX_RETRIES = 5
+# Completion tokens budgeted per request by the rate limiter
+_COMPLETION_TOKEN_ALLOWANCE = 300
+
+# Lazy-initialized client and rate limiter
 _client = None
 _model = None
+_limiter = None
+
+
+def init(api_key=None, model=None, config_path=None):
+    """Create the OpenAI client and load settings from config.json.
+
+    Called once at startup so config errors surface before scraping; the
+    classify functions fall back to calling it lazily.
+    """
+    global _client, _model, _limiter
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "OPENAI_API_KEY not found in environment variables. "
+            "Please set it with: export OPENAI_API_KEY='your_key'"
+        )
+    config_path = config_path or os.path.join(SCRIPT_DIR, "config.json")
+    cfg = {}
+    if os.path.exists(config_path):
+        with open(config_path, "rb") as f:
+            cfg = json_loads(f.read())
+    _model = model or cfg.get("openai_model", "gpt-4o-mini")
+    # The SDK retries rate limits (429), 5xx, timeouts and connection
+    # errors with exponential backoff + jitter, honoring Retry-After
+    _client = AsyncOpenAI(
+        api_key=api_key,
+        max_retries=cfg.get("openai_max_retries", DEFAULT_MAX_RETRIES),
+    )
+    # Optional account limits; requests are paced to stay under them
+    _limiter = _RateLimiter(
+        cfg.get("openai_max_requests_per_minute"),
+        cfg.get("openai_max_tokens_per_minute"),
+    )
 
 
 def _get_client():
-    global _client, _model
     if _client is None:
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OPENAI_API_KEY not found in environment variables. "
-                "Please set it with: export OPENAI_API_KEY='your_key'"
-            )
-        _client = OpenAI(api_key=api_key)
-        config_path = os.path.join(SCRIPT_DIR, "config.json")
-        if os.path.exists(config_path):
-            with open(config_path) as f:
-                cfg = json.load(f)
-            _model = cfg.get("openai_model", "gpt-4o-mini")
-        else:
-            _model = "gpt-4o-mini"
+        init()
     return _client, _model
 
 
-def extract_with_openai(title, page_text):
-    """Use OpenAI to extract structured conference info from page text."""
-    client, model = _get_client()
-
-    prompt = f"""Extract the following fields from this conference announcement page.
-Return a JSON object with exactly these keys. Use empty string "" if a field is not found.
-
-- "submission_deadline": The submission/paper deadline as a human-readable string (e.g. "March 30, 2026"). If the deadline has passed, is "expired", "closed", "TBA", or similar non-date text, return empty string ""
+_EXTRACTION_FIELDS = """- "submission_deadline": The submission/paper deadline as a human-readable string (e.g. "March 30, 2026"). If the deadline has passed, is "expired", "closed", "TBA", or similar non-date text, return empty string ""
 - "deadline_date": The submission deadline as an ISO date YYYY-MM-DD (e.g. "2026-03-30"). If the year is missing, assume 2026. If the deadline has passed or is not a real date, return empty string ""
 - "conference_dates": When the conference takes place (e.g. "September 4-5, 2026")
 - "location": Where the conference is held (city, country, or institution)
 - "keynote_speakers": Names of keynote/invited/plenary speakers, comma-separated
 - "description": A 1-2 sentence summary of what the conference is about
-- "topics": Broad research fields (max 25 words total). Use short general category names like "labor economics, development, trade" — not specific paper titles or session names
+- "topics": Broad research fields (max 25 words total). Use short general category names like "labor economics, development, trade" — not specific paper titles or session names"""
 
-Conference title: {title}
+_RELEVANCE_RULES = """Rules:
+- A conference is relevant if ANY of its topics or sessions broadly falls into at least one include topic. It does NOT need to be the primary focus — even partial overlap is enough.
+- A conference is NOT relevant only if its focus is clearly and specifically on an exclude topic, with no meaningful overlap with include topics.
+  For example: a conference on "AI in finance" or "machine learning for asset pricing" is a FINANCE conference, not a machine-learning conference — exclude it.
+- Broad conferences that accept submissions from many fields (including the include topics) ARE relevant — include them.
+- When in doubt, include the conference."""
 
-Page text:
-{page_text[:4000]}"""
+EXTRACTED_KEYS = (
+    "submission_deadline", "deadline_date", "conference_dates", "location",
+    "keynote_speakers", "description", "topics",
+)
 
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You extract structured data from conference announcements. Always respond with valid JSON only, no markdown fences."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0,
-        )
-        raw = response.choices[0].message.content.strip()
-        if raw.startswith("```"):
-            raw = re.sub(r"^```(?:json)?\s*", "", raw)
-            raw = re.sub(r"\s*```$", "", raw)
-        return json.loads(raw)
-    except Exception as e:
-        print(f"    OpenAI extraction error: {e}")
-        return {}
 
+def _response_format(name, with_relevance):
+    """Strict JSON schema for a single-conference reply."""
+    properties = {key: {"type": "string"} for key in EXTRACTED_KEYS}
+    if with_relevance:
+        properties = {
+            "relevant": {"type": "boolean"},
+            "reason": {"type": "string"},
+            "detected_topics": {"type": "string"},
+            **properties,
+        }
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+        },
+    }
 
-def check_relevance(title, page_text, include_topics, exclude_topics):
-    """Quick OpenAI call to decide if a conference is relevant.
 
-    Returns (bool, str) — (relevant, reason).
-    """
-    client, model = _get_client()
+# Structured outputs make the server return valid JSON matching the schema,
+# so replies are parsed directly with no fence stripping
+_EXTRACTION_FORMAT = _response_format("conference_details", with_relevance=False)
+_CLASSIFICATION_FORMAT = _response_format("conference_classification", with_relevance=True)
+# Packed replies are keyed by item id, so they can only be pinned to JSON
+_PACKED_FORMAT = {"type": "json_object"}
+
 
+def _topic_criteria(include_topics, exclude_topics):
     criteria = ""
     if include_topics:
         criteria += f"Topics to INCLUDE: {include_topics}\n"
     if exclude_topics:
         criteria += f"Topics to EXCLUDE: {exclude_topics}\n"
+    return criteria
 
-    prompt = f"""Decide if this academic conference is relevant for a researcher based on the topic filters below.
-Return a JSON object: {{"relevant": true/false, "reason": "<1 sentence explanation>", "detected_topics": "<comma-separated topics you identified>"}}
 
-{criteria}
-Rules:
-- A conference is relevant if ANY of its topics or sessions broadly falls into at least one include topic. It does NOT need to be the primary focus — even partial overlap is enough.
-- A conference is NOT relevant only if its focus is clearly and specifically on an exclude topic, with no meaningful overlap with include topics.
-  For example: a conference on "AI in finance" or "machine learning for asset pricing" is a FINANCE conference, not a machine-learning conference — exclude it.
-- Broad conferences that accept submissions from many fields (including the include topics) ARE relevant — include them.
-- When in doubt, include the conference.
+# Prompts keep all static instructions in the system message and put the
+# per-conference text last, so every request in a run shares the same
+# prefix and OpenAI's automatic prompt caching can apply to it.
+_EXTRACTION_SYSTEM = f"""You extract structured data from conference announcements. Always respond with valid JSON only.
+
+Extract the following fields from the conference announcement page given by the user.
+Return a JSON object with exactly these keys. Use empty string "" if a field is not found.
+
+{_EXTRACTION_FIELDS}"""
+
+
+def _classification_system(include_topics, exclude_topics):
+    return f"""You classify academic conference relevance and extract structured data from conference announcements. Always respond with valid JSON only.
+
+Decide if the academic conference given by the user is relevant for a researcher based on the topic filters below, and if it is, extract its details.
+Return a JSON object with exactly these keys:
+- "relevant": true/false
+- "reason": <1 sentence explanation of the relevance decision>
+- "detected_topics": <comma-separated topics you identified>
+{_EXTRACTION_FIELDS}
+
+If the conference is not relevant, return empty string "" for every field after "detected_topics". Otherwise use empty string "" if a field is not found.
+
+{_topic_criteria(include_topics, exclude_topics)}
+{_RELEVANCE_RULES}"""
+
+
+# Lowercased line starts of sharing widgets and post footers
+_BOILERPLATE_PREFIXES = (
+    "share this", "share on", "tweet", "subscribe", "tags:", "categories:",
+    "filed under", "posted in", "related posts", "like this:",
+)
+
+
+def _fit(text, max_chars):
+    """Truncate text to max_chars, preferring the last sentence or line end.
+
+    Falls back to a hard cut when the last boundary would drop more than
+    40% of the budget.
+    """
+    if len(text) <= max_chars:
+        return text
+    cut = max(
+        text.rfind(". ", 0, max_chars),
+        text.rfind("! ", 0, max_chars),
+        text.rfind("? ", 0, max_chars),
+        text.rfind("\n", 0, max_chars - 1),
+    )
+    if cut > max_chars * 0.6:
+        return text[:cut + 1]
+    return text[:max_chars]
+
+
+def _distill(text):
+    """Drop share/subscribe/tag boilerplate and repeated paragraphs from page text.
+
+    Short lines are kept even when repeated: labels like "Deadline:" and
+    their values come out of get_text on lines of their own.
+    """
+    seen = set()
+    kept = []
+    for line in text.split("\n"):
+        key = line.strip().lower()
+        if not key or key.startswith(_BOILERPLATE_PREFIXES):
+            continue
+        if len(key) > 40:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def _conference_message(title, page_text):
+    return f"""Conference title: {title}
+
+Page text:
+{_fit(_distill(page_text), 4000)}"""
+
+
+# Token usage across all calls in this run, to confirm prompt-cache hits
+usage = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+
+def _record_usage(response):
+    stats = getattr(response, "usage", None)
+    if stats is None:
+        return
+    usage["requests"] += 1
+    usage["prompt_tokens"] += stats.prompt_tokens or 0
+    details = getattr(stats, "prompt_tokens_details", None)
+    usage["cached_tokens"] += getattr(details, "cached_tokens", 0) or 0
+
+
+class _RateLimiter:
+    """Token buckets for requests and tokens per minute.
+
+    Follows the capacity tracking in OpenAI's api_request_parallel_processor
+    cookbook: both buckets refill continuously up to one minute's worth,
+    and a request waits until both have room for it. A limit of None
+    disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.request_capacity = requests_per_minute or 0
+        self.token_capacity = tokens_per_minute or 0
+        self.last_update = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.last_update
+        self.last_update = now
+        if self.requests_per_minute:
+            self.request_capacity = min(
+                self.requests_per_minute,
+                self.request_capacity + self.requests_per_minute * elapsed / 60,
+            )
+        if self.tokens_per_minute:
+            self.token_capacity = min(
+                self.tokens_per_minute,
+                self.token_capacity + self.tokens_per_minute * elapsed / 60,
+            )
+
+    def observe(self, headers, tokens):
+        """Pause all requests when the server reports a limit is exhausted.
+
+        OpenAI reports what is left of the account's limits in
+        x-ratelimit-* headers; when fewer requests or tokens remain than
+        the request just sent needed, new requests wait for the reset.
+        """
+        for kind, needed in (("requests", 1), ("tokens", tokens)):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = _parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining is None or reset is None:
+                continue
+            try:
+                exhausted = int(remaining) < needed
+            except ValueError:
+                continue
+            if exhausted:
+                self.paused_until = max(self.paused_until, time.monotonic() + reset)
+
+    async def acquire(self, tokens):
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            self._refill()
+            if (
+                (not self.requests_per_minute or self.request_capacity >= 1)
+                and (not self.tokens_per_minute or self.token_capacity >= tokens)
+            ):
+                self.request_capacity -= 1
+                self.token_capacity -= tokens
+                return
+            await asyncio.sleep(0.05)
+
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def _parse_duration(value):
+    """Parse a rate-limit reset like "6m0s" or "20ms" into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def _estimate_tokens(messages):
+    """Rough prompt + completion token count (about 4 chars per token)."""
+    prompt_chars = sum(len(message["content"]) for message in messages)
+    return prompt_chars // 4 + _COMPLETION_TOKEN_ALLOWANCE
+
+
+async def _chat(system, user, response_format):
+    """Send one chat completion and return its parsed JSON reply."""
+    client, model = _get_client()
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+    tokens = _estimate_tokens(messages)
+    await _limiter.acquire(tokens)
+    raw = await client.chat.completions.with_raw_response.create(
+        model=model,
+        messages=messages,
+        temperature=0,
+        response_format=response_format,
+    )
+    _limiter.observe(raw.headers, tokens)
+    response = raw.parse()
+    _record_usage(response)
+    return json_loads(response.choices[0].message.content)
+
+
+async def extract_with_openai(title, page_text):
+    """Use OpenAI to extract structured conference info from page text."""
+    try:
+        data = await _chat(*_request_parts(title, page_text, None, None))
+    except Exception as e:
+        log.warning("    OpenAI extraction error (%s): %s", title[:40], e)
+        return {}
+    return _result_from_data(data, False)[1]
 
-Conference title: {title}
 
-Page text (excerpt):
-{page_text[:1500]}"""
+async def classify_and_extract(title, page_text, include_topics, exclude_topics):
+    """Decide relevance and extract structured fields in a single OpenAI call.
+
+    Returns (relevant, reason, detected_topics, extracted). extracted is {}
+    when the conference is not relevant.
+    """
+    try:
+        data = await _chat(
+            _classification_system(include_topics, exclude_topics),
+            _conference_message(title, page_text),
+            _CLASSIFICATION_FORMAT,
+        )
+    except Exception as e:
+        log.warning("    Classification error (%s): %s", title[:40], e)
+        return True, "error — defaulting to include", "", {}
+
+    return _relevance_from_data(data)
+
+
+def _relevance_from_data(data):
+    """Split a combined reply into (relevant, reason, detected_topics, extracted)."""
+    relevant = bool(data.get("relevant", True))
+    reason = data.get("reason", "")
+    topics = data.get("detected_topics", "")
+    if not relevant:
+        return relevant, reason, topics, {}
+    extracted = {key: data.get(key, "") for key in EXTRACTED_KEYS}
+    return relevant, reason, topics, extracted
+
+
+async def _gather_limited(func, items, max_concurrent):
+    """Await func(*item) for every item, with at most max_concurrent in flight."""
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _one(item):
+        async with semaphore:
+            return await func(*item)
+
+    tasks = [asyncio.create_task(_one(item)) for item in items]
+    return await asyncio.gather(*tasks)
+
+
+async def extract_many(items, max_concurrent=10):
+    """Run extract_with_openai concurrently over (title, page_text) pairs.
+
+    Returns the extracted dicts in input order.
+    """
+    return await _gather_limited(extract_with_openai, items, max_concurrent)
+
+
+def _request_parts(title, page_text, include_topics, exclude_topics):
+    """(system, user, response_format) for classifying one conference."""
+    user = _conference_message(title, page_text)
+    if include_topics or exclude_topics:
+        system = _classification_system(include_topics, exclude_topics)
+        return system, user, _CLASSIFICATION_FORMAT
+    return _EXTRACTION_SYSTEM, user, _EXTRACTION_FORMAT
+
+
+def _result_from_data(data, filtering):
+    """Turn one conference's reply into (relevance, extracted).
+
+    Shared by the single, packed and Batch API paths, so every path maps
+    fields the same way.
+    """
+    if not filtering:
+        return None, {key: data.get(key, "") for key in EXTRACTED_KEYS}
+    relevant, reason, topics, extracted = _relevance_from_data(data)
+    return (relevant, reason, topics), extracted
+
+
+def _error_result(filtering):
+    """(relevance, extracted) for a conference whose request failed."""
+    if not filtering:
+        return None, {}
+    return (True, "error — defaulting to include", ""), {}
+
+
+async def _classify_one(title, page_text, include_topics, exclude_topics):
+    """Classify a single conference, returning (relevance, extracted)."""
+    filtering = bool(include_topics or exclude_topics)
+    try:
+        data = await _chat(*_request_parts(title, page_text, include_topics, exclude_topics))
+    except Exception as e:
+        log.warning("    Classification error (%s): %s", title[:40], e)
+        return _error_result(filtering)
+    return _result_from_data(data, filtering)
+
+
+async def classify_batch(items, include_topics=None, exclude_topics=None, max_concurrent=10):
+    """Classify (title, page_text) pairs concurrently.
+
+    When topic filters are given, each conference costs one combined
+    relevance + extraction call; otherwise a plain extraction call.
+
+    Returns a list of (relevance, extracted) tuples in input order, where
+    relevance is a (relevant, reason, detected_topics) tuple or None when
+    not filtering, and extracted is {} for conferences judged not relevant.
+    """
+    items = [(title, text, include_topics, exclude_topics) for title, text in items]
+    return await _gather_limited(_classify_one, items, max_concurrent)
+
+
+async def _classify_packed(chunk, include_topics, exclude_topics):
+    """Classify several (title, page_text) pairs with one OpenAI call.
+
+    On a rejected request (e.g. context too long) the chunk is split in
+    half and retried; items missing from the reply are classified alone.
+    """
+    filtering = include_topics or exclude_topics
+
+    entries = [
+        {"id": idx, "title": title, "text": _fit(_distill(page_text), 1500)}
+        for idx, (title, page_text) in enumerate(chunk)
+    ]
+    if filtering:
+        task = "For each conference the user sends, decide if it is relevant for a researcher based on the topic filters, and if it is, extract its details."
+        keys = f"""- "relevant": true/false
+- "reason": <1 sentence explanation of the relevance decision>
+- "detected_topics": <comma-separated topics you identified>
+{_EXTRACTION_FIELDS}
+
+If a conference is not relevant, return empty string "" for every field after "detected_topics". Otherwise use empty string "" if a field is not found.
+
+{_topic_criteria(include_topics, exclude_topics)}
+{_RELEVANCE_RULES}"""
+    else:
+        task = "For each conference announcement the user sends, extract the following fields."
+        keys = f"""{_EXTRACTION_FIELDS}
+
+Use empty string "" if a field is not found."""
+
+    system = f"""You extract structured data from batches of conference announcements. Always respond with valid JSON only.
+
+{task}
+The user sends a JSON array of items with "id", "title" and "text".
+Return a JSON object mapping each item's "id" (as a string) to an object with exactly these keys:
+{keys}"""
 
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You classify academic conference relevance. Respond with valid JSON only."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0,
-            max_tokens=120,
+        data = await _chat(
+            system, json.dumps(entries, ensure_ascii=False), _PACKED_FORMAT
         )
-        raw = response.choices[0].message.content.strip()
-        if raw.startswith("```"):
-            raw = re.sub(r"^```(?:json)?\s*", "", raw)
-            raw = re.sub(r"\s*```$", "", raw)
-        data = json.loads(raw)
-        relevant = bool(data.get("relevant", True))
-        reason = data.get("reason", "")
-        topics = data.get("detected_topics", "")
-        return relevant, reason, topics
+    except BadRequestError as e:
+        if len(chunk) == 1:
+            return [await _classify_one(*chunk[0], include_topics, exclude_topics)]
+        half = len(chunk) // 2
+        log.warning("    Batch of %d rejected (%s), retrying in batches of %d", len(chunk), e, half)
+        first = await _classify_packed(chunk[:half], include_topics, exclude_topics)
+        second = await _classify_packed(chunk[half:], include_topics, exclude_topics)
+        return first + second
     except Exception as e:
-        print(f"    Relevance check error: {e}")
-        return True, "error — defaulting to include", ""
+        log.warning("    Batch classification error: %s", e)
+        data = {}
+
+    results = []
+    for idx, (title, page_text) in enumerate(chunk):
+        item = data.get(str(idx)) if isinstance(data, dict) else None
+        if not isinstance(item, dict):
+            results.append(await _classify_one(title, page_text, include_topics, exclude_topics))
+        else:
+            results.append(_result_from_data(item, filtering))
+    return results
+
+
+async def classify_batch_packed(items, include_topics=None, exclude_topics=None, k=8, max_concurrent=10):
+    """Like classify_batch, but packs k conferences into each OpenAI request.
+
+    The instruction block is sent once per request instead of once per
+    conference. Page text is truncated harder (1500 chars per item) to stay
+    within the context window.
+    """
+    items = list(items)
+    chunks = [
+        (items[start:start + k], include_topics, exclude_topics)
+        for start in range(0, len(items), k)
+    ]
+    chunk_results = await _gather_limited(_classify_packed, chunks, max_concurrent)
+    return [result for chunk in chunk_results for result in chunk]
+
+
+BATCH_POLL_SECONDS = 30
+# Below this many uncached conferences, live calls finish in seconds and
+# the Batch API's discount isn't worth its turnaround
+BATCH_API_MIN_ITEMS = 25
+_BATCH_DONE = ("completed", "failed", "expired", "cancelled")
+
+
+async def classify_batch_api(
+    items,
+    include_topics=None,
+    exclude_topics=None,
+    max_concurrent=10,
+    poll_seconds=BATCH_POLL_SECONDS,
+):
+    """Classify (title, page_text) pairs through the OpenAI Batch API.
+
+    Submits one request per conference as a JSONL batch file, then polls
+    until the batch finishes. Batch requests cost half as much as live
+    calls but can take up to 24 hours. Conferences whose request failed,
+    or all of them if the batch cannot be submitted, are classified with
+    live calls instead.
+
+    Returns (relevance, extracted) tuples in input order, as classify_batch.
+    """
+    if not items:
+        return []
+    client, model = _get_client()
+    filtering = include_topics or exclude_topics
+
+    lines = []
+    for idx, (title, page_text) in enumerate(items):
+        system, user, response_format = _request_parts(
+            title, page_text, include_topics, exclude_topics
+        )
+        lines.append(json.dumps({
+            "custom_id": f"conf-{idx}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user},
+                ],
+                "temperature": 0,
+                "response_format": response_format,
+            },
+        }, ensure_ascii=False))
+
+    replies = {}
+    try:
+        batch_file = await client.files.create(
+            file=("classify.jsonl", "\n".join(lines).encode()), purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        log.info("  Submitted batch %s with %d requests", batch.id, len(lines))
+        while batch.status not in _BATCH_DONE:
+            await asyncio.sleep(poll_seconds)
+            batch = await client.batches.retrieve(batch.id)
+            log.info("  Batch %s: %s", batch.id, batch.status)
+        # Expired batches still return the requests that did complete
+        if batch.output_file_id:
+            content = await client.files.content(batch.output_file_id)
+            for line in content.text.splitlines():
+                record = json_loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    body = response["body"]
+                    replies[record["custom_id"]] = body["choices"][0]["message"]["content"]
+    except Exception as e:
+        log.warning("    Batch API error, falling back to live calls: %s", e)
+
+    results = [None] * len(items)
+    retry = []
+    for idx, item in enumerate(items):
+        try:
+            data = json_loads(replies[f"conf-{idx}"])
+        except (KeyError, ValueError):
+            retry.append(idx)
+            continue
+        results[idx] = _result_from_data(data, filtering)
+
+    if retry:
+        log.info("  Classifying %d conferences missing from the batch with live calls", len(retry))
+        fresh = await classify_batch(
+            [items[idx] for idx in retry], include_topics, exclude_topics,
+            max_concurrent=max_concurrent,
+        )
+        for idx, result in zip(retry, fresh):
+            results[idx] = result
+    return results
+
+
+async def embed_titles(titles):
+    """Return an embedding vector for each title, using a single API call."""
+    client, _ = _get_client()
+    response = await client.embeddings.create(model=EMBEDDING_MODEL, input=titles)
+    return [item.embedding for item in response.data]
+
+
+def _is_cacheable(result):
+    """False for error results, which come back as an empty extraction."""
+    relevance, extracted = result
+    return bool(extracted) or (relevance is not None and not relevance[0])
+
+
+def _from_payload(payload):
+    relevance = payload["relevance"]
+    return (tuple(relevance) if relevance else None), payload["extracted"]
+
+
+async def classify_conferences(
+    confs,
+    include_topics=None,
+    exclude_topics=None,
+    batch_size=1,
+    max_concurrent=10,
+    semantic_cache=False,
+    use_batch_api=False,
+    use_cache=True,
+):
+    """Classify scraped conference dicts, reusing results cached on disk.
+
+    Conferences are looked up by title + URL + page text under the current
+    topic filters. With semantic_cache and topic filters, a remaining miss
+    whose title embedding matches a cached conference takes over only that
+    conference's relevance verdict; if relevant, its fields are still
+    extracted from its own page. Only the misses are sent to OpenAI — through the
+    Batch API with use_batch_api (when there are at least
+    BATCH_API_MIN_ITEMS), else packed batch_size per request when
+    batch_size > 1 — and their results are cached. With use_cache=False
+    nothing is looked up, but fresh results still refresh the cache.
+
+    Returns (relevance, extracted) tuples in input order, as classify_batch.
+    """
+    _, model = _get_client()
+    scope = cache.filter_scope(include_topics, exclude_topics, model)
+    keys = [
+        cache.make_key(conf["title"], conf["url"], scope, conf["page_text"])
+        for conf in confs
+    ]
+    if use_cache:
+        payloads = [cache.get(key) for key in keys]
+    else:
+        payloads = [None] * len(confs)
+    missing = [i for i, payload in enumerate(payloads) if payload is None]
+
+    embeddings = {}
+    # Relevance verdicts borrowed from cached conferences with a similar
+    # title. Only the verdict carries over: dates, deadline and location
+    # belong to the other conference (often another edition of the
+    # series), so relevant ones are still extracted from their own page.
+    verdicts = {}
+    filtering = bool(include_topics or exclude_topics)
+    if semantic_cache and use_cache and filtering and missing:
+        try:
+            vectors = await embed_titles([confs[i]["title"] for i in missing])
+        except Exception as e:
+            log.warning("    Embedding error: %s", e)
+            vectors = []
+        index = cache.load_embeddings(scope) if vectors else []
+        for i, vector in zip(missing, vectors):
+            embeddings[i] = vector
+            similar = cache.get_similar(vector, index, confs[i]["url"])
+            if similar and similar.get("relevance"):
+                verdicts[i] = tuple(similar["relevance"])
+        missing = [i for i in missing if i not in verdicts]
+
+    results = [_from_payload(p) if p is not None else None for p in payloads]
+    hits = len(confs) - len(missing) - len(verdicts)
+    if hits:
+        log.info("  Cache: reusing %d of %d previous classifications", hits, len(confs))
+    if verdicts:
+        log.info("  Semantic cache: reusing %d relevance decisions", len(verdicts))
+
+    items = [(confs[i]["title"], confs[i]["page_text"]) for i in missing]
+    if use_batch_api and len(items) >= BATCH_API_MIN_ITEMS:
+        fresh = await classify_batch_api(
+            items, include_topics, exclude_topics, max_concurrent=max_concurrent,
+        )
+    elif batch_size > 1:
+        fresh = await classify_batch_packed(
+            items, include_topics, exclude_topics,
+            k=batch_size, max_concurrent=max_concurrent,
+        )
+    else:
+        fresh = await classify_batch(
+            items, include_topics, exclude_topics, max_concurrent=max_concurrent,
+        )
+
+    for i, result in zip(missing, fresh):
+        results[i] = result
+        if _is_cacheable(result):
+            relevance, extracted = result
+            payload = {"relevance": relevance, "extracted": extracted}
+            cache.put(keys[i], payload, scope, embeddings.get(i), confs[i]["url"])
+
+    to_extract = [i for i, relevance in verdicts.items() if relevance[0]]
+    for i, relevance in verdicts.items():
+        if not relevance[0]:
+            results[i] = (relevance, {})
+    extracted = await extract_many(
+        [(confs[i]["title"], confs[i]["page_text"]) for i in to_extract],
+        max_concurrent=max_concurrent,
+    )
+    for i, fields in zip(to_extract, extracted):
+        results[i] = (verdicts[i], fields)
+        if fields:
+            payload = {"relevance": verdicts[i], "extracted": fields}
+            cache.put(keys[i], payload, scope, embeddings[i], confs[i]["url"])
+    return results
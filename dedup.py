@@ -4,9 +4,33 @@ Matches conferences by normalized date+location, with fuzzy title fallback.
 No OpenAI calls — pure string matching.
 """
 
+import logging
 import re
+from collections import defaultdict
 from datetime import datetime
 
+from normalize import normalize_title
+
+log = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_JACCARD_THRESHOLD = 0.8
+_ISO_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+# "May 15-16, 2026" or "May 15, 2026" or "15 May 2026"
+_DATE_PATTERNS = (
+    re.compile(r"(\w+)\s+(\d{1,2})(?:\s*[-–]\s*\d{1,2})?,?\s*(\d{4})?", re.IGNORECASE),
+    re.compile(r"(\d{1,2})\s+(\w+)\s*(\d{4})?", re.IGNORECASE),
+)
+
+_MONTH_NAMES = {
+    "january": "01", "february": "02", "march": "03", "april": "04",
+    "may": "05", "june": "06", "july": "07", "august": "08",
+    "september": "09", "october": "10", "november": "11", "december": "12",
+    "jan": "01", "feb": "02", "mar": "03", "apr": "04",
+    "jun": "06", "jul": "07", "aug": "08", "sep": "09", "oct": "10",
+    "nov": "11", "dec": "12",
+}
+
 
 def deduplicate(conferences, existing_titles=None):
     """Remove duplicate conferences from the list.
@@ -21,18 +45,24 @@ def deduplicate(conferences, existing_titles=None):
     if existing_titles is None:
         existing_titles = set()
 
-    # First pass: remove conferences already in Excel
-    new_confs = []
-    for conf in conferences:
-        norm_title = normalize_title(conf["title"])
-        if norm_title in existing_titles:
-            print(f"    -> Already in Excel: {conf['title'][:60]}")
-            continue
-        new_confs.append(conf)
-
-    # Second pass: deduplicate among scraped conferences
-    # Group by (date_key, location_key) for exact matches
-    groups = {}
+    # First pass: remove conferences already in Excel. One C-level set
+    # intersection finds the known titles; only those need a per-item check.
+    norms = [normalize_title(conf["title"]) for conf in conferences]
+    already = existing_titles.intersection(norms)
+    if already:
+        new_confs = []
+        for conf, norm_title in zip(conferences, norms):
+            if norm_title in already:
+                log.debug("    -> Already in Excel: %s", conf["title"][:60])
+                continue
+            new_confs.append(conf)
+    else:
+        new_confs = list(conferences)
+
+    # Second pass: deduplicate among scraped conferences.
+    # Conferences with the same (date_key, location_key) are duplicates;
+    # keep the one with the richest page text (first one wins ties).
+    best_by_key = {}
     ungrouped = []
 
     for conf in new_confs:
@@ -41,32 +71,82 @@ def deduplicate(conferences, existing_titles=None):
 
         if date_key and loc_key:
             key = (date_key, loc_key)
-            groups.setdefault(key, []).append(conf)
+            prev = best_by_key.get(key)
+            if prev is None or len(conf.get("page_text", "")) > len(prev.get("page_text", "")):
+                best_by_key[key] = conf
         else:
             ungrouped.append(conf)
 
-    # Within each date+location group, pick the best entry
-    deduped = []
-    for key, group in groups.items():
-        if len(group) == 1:
-            deduped.append(group[0])
-        else:
-            # Multiple conferences at same date+location — check title similarity
-            merged = _pick_best(group)
-            deduped.append(merged)
+    deduped = list(best_by_key.values())
 
     # For ungrouped conferences, check title similarity against everything
+    index = _TitleIndex(deduped)
     for conf in ungrouped:
-        if not _is_title_duplicate(conf, deduped):
+        if not index.is_duplicate(conf):
             deduped.append(conf)
+            index.add(conf)
 
-    print(f"  Dedup: {len(conferences)} raw -> {len(deduped)} unique (skipped {len(conferences) - len(deduped) - (len(conferences) - len(new_confs))} dupes, {len(conferences) - len(new_confs)} already in Excel)")
+    log.info(
+        "  Dedup: %d raw -> %d unique (skipped %d dupes, %d already in Excel)",
+        len(conferences), len(deduped), len(new_confs) - len(deduped),
+        len(conferences) - len(new_confs),
+    )
     return deduped
 
 
-def normalize_title(title):
-    """Normalize a title for comparison (lowercase, strip non-alphanumeric)."""
-    return re.sub(r"[^a-z0-9]", "", title.lower())
+def merge_title_duplicates(conferences):
+    """Collapse conferences whose normalized titles share a 15+ char prefix.
+
+    Runs on classified conferences, since OpenAI may return slightly
+    different titles for the same event. Two titles match when the shorter
+    (at least 15 chars) is a prefix of the longer; a match replaces the
+    first earlier entry it matches if it has a deadline the kept entry
+    lacks, or a longer description.
+
+    Titles are indexed by their normalized form and by every 15+ char
+    prefix, so each conference costs O(title length) lookups instead of a
+    scan over everything kept so far.
+    """
+    deduped = []
+    norms = []
+    by_norm = defaultdict(set)
+    by_prefix = defaultdict(set)
+
+    def _index(pos, norm):
+        if len(norm) >= 15:
+            by_norm[norm].add(pos)
+            for n in range(15, len(norm) + 1):
+                by_prefix[norm[:n]].add(pos)
+
+    def _unindex(pos, norm):
+        if len(norm) >= 15:
+            by_norm[norm].discard(pos)
+            for n in range(15, len(norm) + 1):
+                by_prefix[norm[:n]].discard(pos)
+
+    for conf in conferences:
+        norm = normalize_title(conf["title"])
+        matches = set(by_prefix.get(norm, ()))
+        for n in range(15, len(norm) + 1):
+            matches.update(by_norm.get(norm[:n], ()))
+
+        if not matches:
+            _index(len(deduped), norm)
+            deduped.append(conf)
+            norms.append(norm)
+            continue
+
+        j = min(matches)
+        existing_conf = deduped[j]
+        if (conf.get("deadline_date") and not existing_conf.get("deadline_date")) or len(
+            conf.get("description", "")
+        ) > len(existing_conf.get("description", "")):
+            _unindex(j, norms[j])
+            _index(j, norm)
+            deduped[j] = conf
+            norms[j] = norm
+
+    return deduped
 
 
 def _normalize_dates(date_str):
@@ -81,26 +161,13 @@ def _normalize_dates(date_str):
     date_str = date_str.strip()
 
     # Try ISO format: "2026-05-15"
-    iso_match = re.search(r"(\d{4}-\d{2}-\d{2})", date_str)
+    iso_match = _ISO_DATE_RE.search(date_str)
     if iso_match:
         return iso_match.group(1)
 
     # Try "15 May" or "May 15" patterns (with optional year)
-    month_names = {
-        "january": "01", "february": "02", "march": "03", "april": "04",
-        "may": "05", "june": "06", "july": "07", "august": "08",
-        "september": "09", "october": "10", "november": "11", "december": "12",
-        "jan": "01", "feb": "02", "mar": "03", "apr": "04",
-        "jun": "06", "jul": "07", "aug": "08", "sep": "09", "oct": "10",
-        "nov": "11", "dec": "12",
-    }
-
-    # "May 15-16, 2026" or "May 15, 2026" or "15 May 2026"
-    for pattern in [
-        r"(\w+)\s+(\d{1,2})(?:\s*[-–]\s*\d{1,2})?,?\s*(\d{4})?",
-        r"(\d{1,2})\s+(\w+)\s*(\d{4})?",
-    ]:
-        match = re.search(pattern, date_str, re.IGNORECASE)
+    for pattern in _DATE_PATTERNS:
+        match = pattern.search(date_str)
         if match:
             g = match.groups()
             if g[0].isdigit():
@@ -108,7 +175,7 @@ def _normalize_dates(date_str):
             else:
                 month_name, day, year = g[0], g[1], g[2]
 
-            month_num = month_names.get(month_name.lower())
+            month_num = _MONTH_NAMES.get(month_name.lower())
             if month_num:
                 year = year or "2026"
                 return f"{year}-{month_num}-{int(day):02d}"
@@ -134,43 +201,86 @@ def _normalize_location(location):
     return loc if len(loc) > 2 else None
 
 
-def _pick_best(group):
-    """From a group of similar conferences, pick the one with richest info."""
-    best = group[0]
-    for conf in group[1:]:
-        # Prefer longer page_text (more detail)
-        if len(conf.get("page_text", "")) > len(best.get("page_text", "")):
-            best = conf
-    return best
-
-
-def _is_title_duplicate(conf, existing):
-    """Check if conf's title is similar to any in existing list."""
-    norm = normalize_title(conf["title"])
-    if len(norm) < 10:
-        return False
-
-    for other in existing:
-        other_norm = normalize_title(other["title"])
-        # Check prefix overlap
-        shorter = min(len(norm), len(other_norm))
-        if shorter >= 15:
-            if norm.startswith(other_norm[:shorter]) or other_norm.startswith(norm[:shorter]):
-                return True
-        # Check token overlap
-        if _token_overlap(norm, other_norm) > 0.8:
+class _TitleIndex:
+    """Accepted titles, indexed for fast duplicate checks.
+
+    Stores every prefix (of at least 15 chars) of the normalized titles and
+    an inverted token index, so a candidate is only compared against
+    titles it shares a token with instead of against every title. Token
+    sets are kept as int bitsets over a shared vocabulary, so Jaccard is
+    an AND, an OR and two popcounts. Candidates whose token count alone
+    rules out a match (Jaccard <= min/max size) are skipped before that.
+    """
+
+    def __init__(self, confs=()):
+        self.norms = set()
+        self.prefixes = set()
+        self.vocab = {}
+        self.masks = []
+        self.sizes = []
+        self.postings = defaultdict(set)
+        for conf in confs:
+            self.add(conf)
+
+    def add(self, conf):
+        norm = normalize_title(conf["title"])
+        self.norms.add(norm)
+        self.prefixes.update(norm[:n] for n in range(15, len(norm) + 1))
+        tokens = _title_tokens(conf["title"])
+        for token in tokens:
+            self.postings[token].add(len(self.masks))
+        self.masks.append(self._mask(tokens))
+        self.sizes.append(len(tokens))
+
+    def _mask(self, tokens):
+        mask = 0
+        for token in tokens:
+            mask |= 1 << self.vocab.setdefault(token, len(self.vocab))
+        return mask
+
+    def is_duplicate(self, conf):
+        """Check if conf's title is similar to any indexed title."""
+        norm = normalize_title(conf["title"])
+        if len(norm) < 10:
+            return False
+
+        # Prefix overlap: the shorter title (15+ chars) starts the longer one
+        if norm in self.prefixes:
+            return True
+        if any(norm[:n] in self.norms for n in range(15, len(norm) + 1)):
             return True
 
-    return False
+        # Token overlap, only against titles sharing at least one token
+        tokens = _title_tokens(conf["title"])
+        candidates = set()
+        for token in tokens:
+            candidates.update(self.postings.get(token, ()))
+        if not candidates:
+            return False
+        mask = self._mask(tokens)
+        low = len(tokens) * _JACCARD_THRESHOLD
+        high = len(tokens) / _JACCARD_THRESHOLD
+        return any(
+            low < self.sizes[idx] < high
+            and _token_overlap(mask, self.masks[idx]) > _JACCARD_THRESHOLD
+            for idx in candidates
+        )
+
+
+def _title_tokens(title):
+    """Tokens of the normalized title, split as dedup has always split them.
+
+    normalize_title drops spaces, so this is normally the whole normalized
+    title as a single token, and the overlap check matches equal
+    normalized titles rather than titles sharing most of their words.
+    """
+    return frozenset(_TOKEN_RE.findall(normalize_title(title)))
 
 
-def _token_overlap(a, b):
-    """Compute token-level Jaccard similarity between two normalized strings."""
-    # Re-tokenize (split on runs of letters/digits)
-    tokens_a = set(re.findall(r"[a-z0-9]+", a))
-    tokens_b = set(re.findall(r"[a-z0-9]+", b))
-    if not tokens_a or not tokens_b:
+def _token_overlap(mask_a, mask_b):
+    """Compute token-level Jaccard similarity between two token bitsets."""
+    if not mask_a or not mask_b:
         return 0.0
-    intersection = tokens_a & tokens_b
-    union = tokens_a | tokens_b
-    return len(intersection) / len(union)
+    intersection = bin(mask_a & mask_b).count("1")
+    union = bin(mask_a | mask_b).count("1")
+    return intersection / union
@@ -3,27 +3,81 @@
 import os
 import re
 from datetime import datetime, date
+from functools import lru_cache
 from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, NamedStyle, PatternFill, Border, Side
+from openpyxl.utils import get_column_letter
+
+from normalize import normalize_title
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 XLSX_PATH = os.path.join(SCRIPT_DIR, "conferences.xlsx")
 
-
-def normalize_title(title):
-    """Normalize a title for comparison (lowercase, strip non-alphanumeric)."""
-    return re.sub(r"[^a-z0-9]", "", title.lower())
-
-
+_DEADLINE_FORMATS = ("%B %d, %Y", "%d %B %Y", "%B %d %Y")
+_ISO_RE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})$")
+_MDY_RE = re.compile(r"\s*([A-Za-z]+)\s+(\d{1,2}),?\s+(\d{4})\s*$")
+_DMY_RE = re.compile(r"\s*(\d{1,2})\s+([A-Za-z]+),?\s+(\d{4})\s*$")
+_MONTHS = {
+    name.lower(): num
+    for num, name in enumerate(
+        ["January", "February", "March", "April", "May", "June", "July",
+         "August", "September", "October", "November", "December"],
+        start=1,
+    )
+}
+
+# Style objects are immutable, so they are built once and shared by all cells
+HEADER_FONT = Font(name="Calibri", bold=True, color="FFFFFF", size=11)
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+BODY_FONT = Font(name="Calibri", size=10)
+WRAP_ALIGNMENT = Alignment(wrap_text=True, vertical="top")
+THIN_BORDER = Border(
+    left=Side(style="thin"), right=Side(style="thin"),
+    top=Side(style="thin"), bottom=Side(style="thin"),
+)
+# Body cells share one named style, so each cell takes a single assignment
+BODY_STYLE = "Conference Body"
+ACTIVE_HEADER_FILL = PatternFill(start_color="2F5496", end_color="2F5496", fill_type="solid")
+PAST_HEADER_FILL = PatternFill(start_color="7F7F7F", end_color="7F7F7F", fill_type="solid")
+
+# (conf key, sheet header) for the columns read back by load_existing_xlsx
+_LOAD_COLUMNS = (
+    ("title", "Title"),
+    ("submission_deadline", "Submission Deadline"),
+    ("conference_dates", "Conference Dates"),
+    ("location", "Location"),
+    ("keynote_speakers", "Keynote Speakers"),
+    ("description", "Description"),
+    ("topics", "Topics"),
+    ("url", "URL"),
+)
+
+
+@lru_cache(maxsize=4096)
 def parse_deadline_date(date_str):
-    """Parse an ISO date string or common format into a date object."""
+    """Parse an ISO date string or common format into a date object.
+
+    Memoized: the same deadline strings recur across workbook rows and
+    OpenAI replies, and dates are immutable so cached results are safe.
+    """
     if not date_str:
         return None
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d").date()
-    except ValueError:
-        pass
-    for fmt in ["%B %d, %Y", "%d %B %Y", "%B %d %Y"]:
+    # Fast paths: "2026-03-30", "March 30, 2026" and "30 March 2026"
+    match = _ISO_RE.match(date_str)
+    if match:
+        return _make_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    match = _MDY_RE.match(date_str)
+    if match:
+        month = _MONTHS.get(match.group(1).lower())
+        if month:
+            return _make_date(int(match.group(3)), month, int(match.group(2)))
+    match = _DMY_RE.match(date_str)
+    if match:
+        month = _MONTHS.get(match.group(2).lower())
+        if month:
+            return _make_date(int(match.group(3)), month, int(match.group(1)))
+    for fmt in _DEADLINE_FORMATS:
         try:
             return datetime.strptime(date_str.replace(",", "").strip(), fmt).date()
         except ValueError:
@@ -31,6 +85,13 @@ def parse_deadline_date(date_str):
     return None
 
 
+def _make_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
 def load_existing_xlsx(xlsx_path=None):
     """Load conferences from existing Excel file.
 
@@ -51,25 +112,21 @@ def load_existing_xlsx(xlsx_path=None):
         if sheet_name not in wb.sheetnames:
             continue
         ws = wb[sheet_name]
-        rows = list(ws.iter_rows(values_only=True))
-        if len(rows) < 2:
+        rows = ws.iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
             continue
-        headers = [str(h).strip() if h else "" for h in rows[0]]
-        for row in rows[1:]:
-            row_dict = {}
-            for col_idx, header in enumerate(headers):
-                val = row[col_idx] if col_idx < len(row) else ""
-                row_dict[header] = str(val).strip() if val else ""
-            conf = {
-                "title": row_dict.get("Title", ""),
-                "submission_deadline": row_dict.get("Submission Deadline", ""),
-                "conference_dates": row_dict.get("Conference Dates", ""),
-                "location": row_dict.get("Location", ""),
-                "keynote_speakers": row_dict.get("Keynote Speakers", ""),
-                "description": row_dict.get("Description", ""),
-                "topics": row_dict.get("Topics", ""),
-                "url": row_dict.get("URL", ""),
-            }
+        col_map = {
+            (str(h).strip() if h else ""): i for i, h in enumerate(header_row)
+        }
+        # Positions of the known columns; absent headers map to None
+        positions = [(key, col_map.get(header)) for key, header in _LOAD_COLUMNS]
+        for row in rows:
+            conf = {}
+            for key, i in positions:
+                # Short rows leave trailing columns out; those default to ""
+                val = row[i] if i is not None and i < len(row) else None
+                conf[key] = str(val).strip() if val else ""
             conf["deadline_date"] = parse_deadline_date(conf["submission_deadline"])
             if conf["title"]:
                 known_titles.add(normalize_title(conf["title"]))
@@ -91,66 +148,88 @@ def format_deadline(conf):
     return conf.get("submission_deadline", "")
 
 
-def _write_sheet(ws, conferences, header_fill, header_font, thin_border):
-    """Write conference rows into a worksheet."""
+def _row_values(conf):
+    """Cell values written for one conference, in column order."""
+    return (
+        conf.get("title", ""),
+        format_deadline(conf),
+        conf.get("conference_dates", ""),
+        conf.get("location", ""),
+        conf.get("keynote_speakers", ""),
+        conf.get("description", ""),
+        conf.get("topics", ""),
+        conf.get("url", ""),
+    )
+
+
+def workbook_is_current(active_conferences, past_conferences,
+                        existing_active, existing_past, filename=None):
+    """True if the file already holds exactly these rows in this order.
+
+    existing_active / existing_past are the rows load_existing_xlsx read
+    from the file; when nothing changed, rewriting it can be skipped.
+    """
+    if not os.path.exists(filename or XLSX_PATH):
+        return False
+    return (
+        list(map(_row_values, active_conferences)) == list(map(_row_values, existing_active))
+        and list(map(_row_values, past_conferences)) == list(map(_row_values, existing_past))
+    )
+
+
+def _write_sheet(ws, conferences, header_fill):
+    """Stream conference rows into a write-only worksheet.
+
+    The workbook must have the BODY_STYLE named style registered.
+    """
     headers = [
         "Title", "Submission Deadline", "Conference Dates",
         "Location", "Keynote Speakers", "Description", "Topics", "URL",
     ]
 
-    for col_idx, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = thin_border
-
-    body_font = Font(name="Calibri", size=10)
-    wrap_alignment = Alignment(wrap_text=True, vertical="top")
-
-    for row_idx, conf in enumerate(conferences, 2):
-        row_data = [
-            conf.get("title", ""),
-            format_deadline(conf),
-            conf.get("conference_dates", ""),
-            conf.get("location", ""),
-            conf.get("keynote_speakers", ""),
-            conf.get("description", ""),
-            conf.get("topics", ""),
-            conf.get("url", ""),
-        ]
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            cell.font = body_font
-            cell.alignment = wrap_alignment
-            cell.border = thin_border
-
+    # Write-only sheets need layout settings before the first row is written
     col_widths = [45, 22, 28, 35, 40, 60, 50, 55]
     for col_idx, width in enumerate(col_widths, 1):
-        ws.column_dimensions[chr(64 + col_idx)].width = width
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
 
     ws.freeze_panes = "A2"
 
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.fill = header_fill
+        cell.font = HEADER_FONT
+        cell.alignment = HEADER_ALIGNMENT
+        cell.border = THIN_BORDER
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for conf in conferences:
+        cells = []
+        for value in _row_values(conf):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = BODY_STYLE
+            cells.append(cell)
+        ws.append(cells)
+
 
 def write_to_excel(active_conferences, past_conferences, filename=None):
-    """Write active and past conferences to an Excel file with two sheets."""
-    filename = filename or XLSX_PATH
-    wb = Workbook()
+    """Write active and past conferences to an Excel file with two sheets.
 
-    header_fill = PatternFill(start_color="2F5496", end_color="2F5496", fill_type="solid")
-    header_font = Font(name="Calibri", bold=True, color="FFFFFF", size=11)
-    thin_border = Border(
-        left=Side(style="thin"), right=Side(style="thin"),
-        top=Side(style="thin"), bottom=Side(style="thin"),
-    )
+    Uses a write-only workbook, so rows are streamed to disk instead of
+    being held as a full cell graph in memory.
+    """
+    filename = filename or XLSX_PATH
+    wb = Workbook(write_only=True)
+    wb.add_named_style(NamedStyle(
+        name=BODY_STYLE, font=BODY_FONT, alignment=WRAP_ALIGNMENT, border=THIN_BORDER,
+    ))
 
-    ws_active = wb.active
-    ws_active.title = "Conferences"
-    _write_sheet(ws_active, active_conferences, header_fill, header_font, thin_border)
+    ws_active = wb.create_sheet("Conferences")
+    _write_sheet(ws_active, active_conferences, ACTIVE_HEADER_FILL)
 
     ws_past = wb.create_sheet("Past Conferences")
-    past_header_fill = PatternFill(start_color="7F7F7F", end_color="7F7F7F", fill_type="solid")
-    _write_sheet(ws_past, past_conferences, past_header_fill, header_font, thin_border)
+    _write_sheet(ws_past, past_conferences, PAST_HEADER_FILL)
 
     wb.save(filename)
     print(f"\nExcel file saved: {filename}")
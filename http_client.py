@@ -0,0 +1,412 @@
+"""Shared HTTP sessions for the scrapers.
+
+Each thread gets one memoized requests session, with retries, a browser-like
+user agent and a connection pool sized for concurrent fetches. Request starts
+to each host are spaced out across all threads, and a Retry-After from the
+server holds back every thread's requests to that host. A scraper and
+any helpers it calls on the same thread share that session's keep-alive
+connections. Threads get separate sessions because a requests.Session is not
+guaranteed to be thread-safe. Concurrent page fetches run on one long-lived
+pool of worker threads, and every session is closed when the process exits.
+
+Listing pages can be revalidated with ETag / Last-Modified validators saved
+in listing_cache.json, so unchanged pages cost a 304 instead of a download
+and parse.
+
+Parsed detail pages can be kept in page_cache.sqlite, so a page that was
+fetched but never made it into the workbook (irrelevant, excluded, or
+missing fields) is not downloaded and parsed again on every run. Pages
+served with validators are revalidated like listing pages; the rest are
+reused for PAGE_CACHE_TTL.
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from urllib3.util.request import ACCEPT_ENCODING
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    from json import loads as json_loads
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LISTING_CACHE_PATH = os.path.join(SCRIPT_DIR, "listing_cache.json")
+PAGE_CACHE_PATH = os.path.join(SCRIPT_DIR, "page_cache.sqlite")
+
+# Parsed detail pages served without ETag / Last-Modified cannot be
+# revalidated, so they are reused unchecked for a day: an edit such as an
+# extended deadline is picked up on the first run after that
+PAGE_CACHE_TTL = 24 * 3600
+
+# Distinct hosts kept in the pool, and keep-alive connections per host
+HTTP_POOL_CONNECTIONS = 8
+HTTP_POOL_MAXSIZE = 16
+
+# Detail pages fetched at once from one site
+FETCH_WORKERS = 4
+
+# Worker threads shared by every scraper's fetches; each call still keeps
+# at most its own window of pages in flight
+FETCH_POOL_WORKERS = 16
+
+# Minimum seconds between request starts to one host, across all threads.
+# Slow responses already space requests out, so this only delays requests
+# that would otherwise start in a burst.
+HOST_MIN_INTERVAL = 0.2
+
+# Bytes of a detail page that are downloaded and parsed; the content the
+# scrapers keep sits well before this, and a page only gets bigger through
+# inline assets and long comment threads
+MAX_PAGE_BYTES = 1024 * 1024
+
+_local = threading.local()
+_listing_lock = threading.Lock()
+_fetch_pool = None
+_fetch_pool_lock = threading.Lock()
+_sessions = []
+_sessions_lock = threading.Lock()
+
+
+class _HostThrottle:
+    """Per-host politeness limit shared by every thread's session.
+
+    Each host has a next-allowed start time. A request waits only for what
+    remains of HOST_MIN_INTERVAL since the previous start. A 429 or 503
+    with a Retry-After delay pushes that host's next start out for every
+    thread, not just the one that was told to back off.
+    """
+
+    def __init__(self, interval=HOST_MIN_INTERVAL):
+        self.interval = interval
+        self.next_ok = {}
+        self.lock = threading.Lock()
+
+    def wait(self, host):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_ok.get(host, now))
+            self.next_ok[host] = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def observe(self, host, status, retry_after):
+        if status not in (429, 503) or not (retry_after or "").isdigit():
+            return
+        with self.lock:
+            until = time.monotonic() + int(retry_after)
+            self.next_ok[host] = max(self.next_ok.get(host, 0.0), until)
+
+
+_throttle = _HostThrottle()
+
+
+class _ThrottledAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter that spaces out request starts per host via _throttle."""
+
+    def send(self, request, **kwargs):
+        _throttle.wait(urlsplit(request.url).hostname)
+        return super().send(request, **kwargs)
+
+
+class _SharedRetry(requests.adapters.Retry):
+    """Retry that reports a server's Retry-After to _throttle.
+
+    urllib3 sleeps out the Retry-After only in the thread that got it; the
+    throttle makes the other threads' requests to that host wait too.
+    """
+
+    def increment(self, method=None, url=None, response=None, error=None,
+                  _pool=None, _stacktrace=None):
+        if response is not None and _pool is not None:
+            _throttle.observe(
+                _pool.host, response.status, response.headers.get("Retry-After")
+            )
+        return super().increment(
+            method, url, response=response, error=error,
+            _pool=_pool, _stacktrace=_stacktrace,
+        )
+
+
+def make_session():
+    """Create a requests session with retries and a browser-like user agent.
+
+    The connection pool is sized for concurrent detail-page fetches, so
+    keep-alive connections are reused instead of being discarded and
+    re-opened (a new TCP + TLS handshake) once more than the default 10
+    requests to one host are in flight.
+    """
+    session = requests.Session()
+    adapter = _ThrottledAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=_SharedRetry(
+            total=3,
+            backoff_factor=2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+        # Every encoding urllib3 can decode here: gzip and deflate, plus br
+        # and zstd when brotli / zstandard are installed
+        "Accept-Encoding": ACCEPT_ENCODING,
+    })
+    return session
+
+
+def get_session():
+    """Return this thread's shared session, creating it on first use."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = make_session()
+        with _sessions_lock:
+            _sessions.append(session)
+    return session
+
+
+@atexit.register
+def _close_sessions():
+    """Close every session get_session handed out, releasing its connections."""
+    with _sessions_lock:
+        sessions = _sessions[:]
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def get_text(session, url, timeout=60, max_bytes=MAX_PAGE_BYTES):
+    """GET url and return at most max_bytes of its body, decoded.
+
+    The body is streamed and the connection released once the cap is hit,
+    so an oversized page costs neither the full download nor a full parse.
+    Raises for HTTP error statuses, like raise_for_status().
+    """
+    return get_page(session, url, timeout=timeout, max_bytes=max_bytes)[1]
+
+
+def get_page(session, url, headers=None, timeout=60, max_bytes=MAX_PAGE_BYTES):
+    """Like get_text, but send headers and return (response, text).
+
+    text is None for a 304 Not Modified, which has no body.
+    """
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        if resp.status_code == 304:
+            return resp, None
+        body = bytearray()
+        for chunk in resp.iter_content(chunk_size=64 * 1024):
+            body += chunk
+            if len(body) >= max_bytes:
+                break
+        text = bytes(body[:max_bytes]).decode(resp.encoding or "utf-8", errors="replace")
+        return resp, text
+
+
+def _fetch_on_worker(fetch, url):
+    return fetch(get_session(), url)
+
+
+def _get_fetch_pool():
+    """Return the long-lived pool the fetch helpers share, creating it on first use.
+
+    Its threads outlive each call, so each keeps one session (and its
+    keep-alive connections) for the whole run instead of a fresh one per
+    scraper call.
+    """
+    global _fetch_pool
+    with _fetch_pool_lock:
+        if _fetch_pool is None:
+            _fetch_pool = ThreadPoolExecutor(
+                max_workers=FETCH_POOL_WORKERS, thread_name_prefix="fetch"
+            )
+        return _fetch_pool
+
+
+def _submit(fetch, url):
+    """Start fetch(session, url) on a pool thread, with that thread's session.
+
+    The task runs in a copy of the caller's context, so anything the caller
+    set in a context variable (such as run.py's per-scraper output buffer)
+    also applies to what fetch prints.
+    """
+    return _get_fetch_pool().submit(
+        contextvars.copy_context().run, _fetch_on_worker, fetch, url
+    )
+
+
+def _fetch_window(fetch, urls, window, limit):
+    """Yield fetch(session, url) for urls, in order, with up to window in flight.
+
+    The window doubles, up to limit, each time the caller takes a page and
+    asks for the next. Pages not yet started when the caller stops
+    consuming are cancelled.
+    """
+    pending = deque()
+    try:
+        while True:
+            while len(pending) < window:
+                url = next(urls, None)
+                if url is None:
+                    break
+                pending.append(_submit(fetch, url))
+            if not pending:
+                return
+            yield pending.popleft().result()
+            window = min(window * 2, limit)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def fetch_all(fetch, urls, max_workers=FETCH_WORKERS):
+    """Yield fetch(session, url) for each url, in order, fetching concurrently.
+
+    Page fetches are network-bound, so the shared worker threads (each with
+    its own session) overlap their round trips; max_workers bounds how many
+    of these pages are in flight at once, and so the load put on the site.
+    """
+    yield from _fetch_window(fetch, iter(urls), max_workers, max_workers)
+
+
+def fetch_pages(fetch, session, urls, ahead=FETCH_WORKERS):
+    """Yield fetch(session, url) for paginated urls, in order, prefetching.
+
+    The first page is fetched on the caller's session before anything is
+    handed to the workers, since incremental runs usually stop there. After
+    that, pages run on the worker threads' own sessions, one at a time at
+    first; the number in flight doubles, up to ahead, for as long as the
+    caller keeps asking for more. So a run that stops on page 1 or 2 sends
+    no request past it. The caller stops pagination by no longer consuming;
+    pages not yet started are then cancelled.
+    """
+    urls = iter(urls)
+    first = next(urls, None)
+    if first is None:
+        return
+    yield fetch(session, first)
+    yield from _fetch_window(fetch, urls, 1, ahead)
+
+
+def _page_cache():
+    """Return this thread's connection to the page cache, creating it on first use."""
+    conn = getattr(_local, "page_cache", None)
+    if conn is None:
+        conn = _local.page_cache = sqlite3.connect(PAGE_CACHE_PATH)
+        # Fetch threads write concurrently; WAL lets readers proceed meanwhile
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT PRIMARY KEY, payload TEXT, ts REAL, etag TEXT, last_modified TEXT)"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+        if "etag" not in columns:  # caches written before pages were revalidated
+            conn.execute("ALTER TABLE pages ADD COLUMN etag TEXT")
+            conn.execute("ALTER TABLE pages ADD COLUMN last_modified TEXT")
+    return conn
+
+
+def cached_page(failed=None):
+    """Turn a parse(html) function into a cached fetch(session, url).
+
+    A cached page served with an ETag or Last-Modified is revalidated with
+    a conditional GET, and its stored result is returned on a 304. One
+    served without validators is returned without a request while younger
+    than PAGE_CACHE_TTL, so an edit within that window is missed until it
+    expires. Only results with no None parts are stored; partial parses
+    are retried next time. A failed request is printed and returns failed.
+    Tuples come back from the cache as lists.
+    """
+    def decorator(parse):
+        @functools.wraps(parse)
+        def wrapper(session, url):
+            conn = _page_cache()
+            row = conn.execute(
+                "SELECT payload, ts, etag, last_modified FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            entry = None
+            if row:
+                payload, ts, etag, last_modified = row
+                if etag or last_modified:
+                    entry = {"etag": etag, "last_modified": last_modified}
+                elif ts > time.time() - PAGE_CACHE_TTL:
+                    return json_loads(payload)
+            try:
+                resp, html = get_page(session, url, conditional_headers(entry))
+            except Exception as e:
+                print(f"    Error fetching {url}: {e}")
+                return failed
+            if html is None:
+                return json_loads(payload)
+            result = parse(html)
+            parts = result if isinstance(result, tuple) else (result,)
+            if all(part is not None for part in parts):
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO pages (url, payload, ts, etag, last_modified) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (url, json.dumps(result), time.time(),
+                         resp.headers.get("ETag"), resp.headers.get("Last-Modified")),
+                    )
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def load_listing_cache():
+    """Return {url: {"etag", "last_modified", "items"}} saved by earlier runs.
+
+    items is whatever the scraper parsed from that page (JSON-serializable).
+    """
+    try:
+        with open(LISTING_CACHE_PATH, "rb") as f:
+            return json_loads(f.read())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_listing_cache(entries):
+    """Merge entries into the listing cache file.
+
+    Scrapers run in parallel threads, so the read-merge-write is locked.
+    """
+    with _listing_lock:
+        cached = load_listing_cache()
+        cached.update(entries)
+        with open(LISTING_CACHE_PATH, "w") as f:
+            json.dump(cached, f)
+
+
+def conditional_headers(entry):
+    """If-None-Match / If-Modified-Since headers for a cached listing page."""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def listing_entry(resp, items):
+    """Cache entry for a freshly fetched listing page, or None if uncacheable."""
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return None
+    return {"etag": etag, "last_modified": last_modified, "items": items}
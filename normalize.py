@@ -0,0 +1,18 @@
+"""Title normalization shared by deduplication and the Excel loader."""
+
+from functools import lru_cache
+
+_KEEP_BYTES = b"abcdefghijklmnopqrstuvwxyz0123456789"
+# ASCII bytes outside [a-z0-9]; non-ASCII is already dropped by the encode
+_DROP_BYTES = bytes(b for b in range(128) if b not in _KEEP_BYTES)
+
+
+@lru_cache(maxsize=8192)
+def normalize_title(title):
+    """Normalize a title for comparison (lowercase, strip non-alphanumeric).
+
+    Keeps only ASCII a-z and 0-9 of the lowercased title. Done with a
+    C-level bytes.translate rather than a regex substitution.
+    """
+    ascii_title = title.lower().encode("ascii", "ignore")
+    return ascii_title.translate(None, _DROP_BYTES).decode("ascii")
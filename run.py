@@ -10,22 +10,33 @@ Usage:
 """
 
 import argparse
+import asyncio
+import contextlib
+import contextvars
+import heapq
 import importlib
+import inspect
+import io
+import logging
 import os
 import pkgutil
 import re
+import sys
 import warnings
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
-
-import requests
+from itertools import chain
+from operator import itemgetter
 
 import scrapers
-from dedup import deduplicate, normalize_title
-from classify import extract_with_openai, check_relevance
+from dedup import deduplicate, merge_title_duplicates
+from http_client import get_session
+from normalize import normalize_title
+from classify import classify_conferences, init as init_openai, usage as openai_usage
 from excel_writer import (
     load_existing_xlsx,
     parse_deadline_date,
+    workbook_is_current,
     write_to_excel,
 )
 
@@ -33,6 +44,15 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 TODAY = date.today()
 
+# Past conferences kept in the workbook, most recent deadline first
+MAX_PAST = 10
+
+# Deadline text that marks a call as closed, or that is only a placeholder
+_EXPIRED_RE = re.compile(r"expired|passed|closed", re.IGNORECASE)
+_PLACEHOLDER_RE = re.compile(r"tba|to be announced|n/a", re.IGNORECASE)
+# Four-digit years, to spot pages that only mention past years
+_YEAR_RE = re.compile(r"\b(20\d{2})\b")
+
 
 def _require_openai_api_key():
     """Fail fast if the OpenAI API key is missing."""
@@ -43,6 +63,22 @@ def _require_openai_api_key():
         )
 
 
+def _deadline_or_none(conf):
+    """Return the parsed deadline date, or None if missing or unparsed text."""
+    dl = conf.get("deadline_date")
+    return dl if dl and not isinstance(dl, str) else None
+
+
+def _deadline_sort_key(conf):
+    """Sort key putting parsed deadlines first, earliest first.
+
+    Conferences without a parsed deadline share one key, so a stable sort
+    leaves them at the end in their original order.
+    """
+    dl = _deadline_or_none(conf)
+    return (0, dl) if dl else (1, date.max)
+
+
 def parse_args():
     parser = argparse.ArgumentParser(
         description="Scrape conferences from multiple sources"
@@ -62,7 +98,7 @@ def parse_args():
     parser.add_argument(
         "--debug",
         action="store_true",
-        help="Print detailed reasoning for include/exclude decisions",
+        help="Print detailed reasoning for include/exclude decisions and per-item dedup messages",
     )
     parser.add_argument(
         "--scrapers",
@@ -70,23 +106,149 @@ def parse_args():
         default=None,
         help='Comma-separated scraper names to run (e.g. "inomics,misfit"). Default: all',
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="Maximum number of OpenAI classification requests in flight at once (default: 10)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Conferences packed into each OpenAI request (default: 1, i.e. no packing)",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Classify via the OpenAI Batch API when 25+ conferences need it (half price, but may take up to 24 hours)",
+    )
+    parser.add_argument(
+        "--semantic-cache",
+        action="store_true",
+        help="Also reuse cached classifications of conferences with near-identical titles",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached classifications and send every conference to OpenAI",
+    )
     return parser.parse_args()
 
 
-def _make_session():
-    """Create a requests session with retries and a browser-like user agent."""
-    session = requests.Session()
-    adapter = requests.adapters.HTTPAdapter(
-        max_retries=requests.adapters.Retry(
-            total=3, backoff_factor=2, status_forcelist=[429, 500, 502, 503, 504]
-        )
-    )
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-    })
-    return session
+class _ThreadBufferedStdout(io.TextIOBase):
+    """stdout proxy that buffers writes from contexts that registered a buffer.
+
+    Lets scrapers run in parallel while each one's progress output is
+    printed as a single block instead of interleaved line by line. The
+    buffer is a context variable, so the fetch workers http_client starts
+    for a scraper (which run in a copy of its context) write to it too.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = contextvars.ContextVar("buffer", default=None)
+
+    def write(self, text):
+        return (self.buffer.get() or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def _recent_unique_past(conferences):
+    """Return the MAX_PAST most recent past conferences, one per title.
+
+    Among conferences sharing a normalized title, the latest parsed deadline
+    wins (the first one on ties, or if none has a deadline). Conferences
+    with a deadline come first, latest first, then those without one.
+    """
+    best = {}
+    for i, c in enumerate(conferences):
+        norm = normalize_title(c["title"])
+        dl = _deadline_or_none(c)
+        kept = best.get(norm)
+        if kept is None:
+            best[norm] = (i, dl, c)
+        elif dl and (kept[1] is None or dl > kept[1]):
+            best[norm] = (i, dl, c)
+
+    with_deadline, without_deadline = [], []
+    for _, dl, c in sorted(best.values(), key=itemgetter(0)):
+        (with_deadline if dl else without_deadline).append(c)
+    recent = heapq.nlargest(MAX_PAST, with_deadline, key=itemgetter("deadline_date"))
+    return recent + without_deadline[:MAX_PAST - len(recent)]
+
+
+def _topic_regex(topics):
+    """Compile comma-separated topics into a whole-word, case-insensitive regex."""
+    terms = [t.strip() for t in (topics or "").split(",") if t.strip()]
+    if not terms:
+        return None
+    alternation = "|".join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)
+
+
+def _iter_scraper_modules(selected=None):
+    """Yield (name, module) for each scraper in scrapers/.
+
+    Only modules named in selected are imported, so unused scrapers and
+    their dependencies are never loaded. Private modules are skipped.
+    """
+    found = set()
+    for _, name, _ in pkgutil.iter_modules(scrapers.__path__):
+        if name.startswith("_") or (selected and name.lower() not in selected):
+            continue
+        found.add(name.lower())
+        mod = importlib.import_module(f"scrapers.{name}")
+        if hasattr(mod, "scrape"):
+            yield name, mod
+    for name in sorted((selected or set()) - found):
+        print(f"  WARNING: no scraper named '{name}' in scrapers/")
+
+
+def _run_scrapers(modules, known_urls, known_titles=frozenset()):
+    """Run each scraper module in its own thread, with that thread's session.
+
+    Scrapers hit different hosts and are network-bound, so the scrape
+    stage takes as long as the slowest source rather than the sum.
+    Returns [(name, conferences)] in discovery order, so downstream dedup
+    is deterministic; each scraper's output is printed when it finishes.
+    Conferences whose URL is already in known_urls are dropped; scrapers
+    that accept known_titles also get the normalized titles in Excel.
+    """
+    # Shared read-only across the scraper threads
+    known_urls = frozenset(known_urls)
+    output = _ThreadBufferedStdout(sys.stdout)
+
+    def _scrape(name, mod):
+        buffer = io.StringIO()
+        token = output.buffer.set(buffer)
+        try:
+            print(f"\n--- {name} ---")
+            kwargs = {"known_urls": known_urls}
+            # Older scrapers only take known_urls
+            if "known_titles" in inspect.signature(mod.scrape).parameters:
+                kwargs["known_titles"] = known_titles
+            confs = mod.scrape(get_session(), **kwargs)
+            # Scrapers are expected to skip known URLs themselves; enforce it
+            # so one that doesn't cannot re-add conferences already in Excel
+            fresh = [c for c in confs if c["url"] not in known_urls]
+            if len(fresh) < len(confs):
+                print(f"  {name}: dropped {len(confs) - len(fresh)} already-known URLs")
+            print(f"  {name}: {len(fresh)} conferences")
+            return fresh
+        finally:
+            output.buffer.reset(token)
+            output.stream.write(buffer.getvalue())
+
+    results = {}
+    with contextlib.redirect_stdout(output):
+        with ThreadPoolExecutor(max_workers=max(1, len(modules))) as pool:
+            futures = {pool.submit(_scrape, name, mod): name for name, mod in modules}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+    return [(name, results[name]) for name, _ in modules]
 
 
 def _check_openai_api():
@@ -112,10 +274,16 @@ def _check_openai_api():
 
 def main():
     args = parse_args()
+    # Project modules log per-item detail at DEBUG and summaries at INFO;
+    # third-party loggers (httpx, urllib3) stay at the WARNING default
+    logging.basicConfig(format="%(message)s")
+    for name in ("dedup", "classify"):
+        logging.getLogger(name).setLevel(logging.DEBUG if args.debug else logging.INFO)
     _require_openai_api_key()
     print("Checking OpenAI API connectivity...")
     _check_openai_api()
     print("OpenAI API OK")
+    init_openai()
     include_topics = args.include
     exclude_topics = args.exclude
     debug = args.debug
@@ -140,8 +308,8 @@ def main():
     still_active = []
     newly_past = []
     for conf in existing_active:
-        dl = conf.get("deadline_date")
-        if dl and not isinstance(dl, str) and dl < TODAY:
+        dl = _deadline_or_none(conf)
+        if dl and dl < TODAY:
             print(f"  Deadline passed: {conf['title'][:60]}")
             newly_past.append(conf)
         else:
@@ -157,99 +325,128 @@ def main():
     if args.scrapers:
         selected = {s.strip().lower() for s in args.scrapers.split(",")}
     print("\n[1/5] Scraping conferences from all sources...")
-    session = _make_session()
 
-    all_scraped = []
-    for finder, name, _ in pkgutil.iter_modules(scrapers.__path__):
-        if selected and name.lower() not in selected:
-            continue
-        mod = importlib.import_module(f"scrapers.{name}")
-        if not hasattr(mod, "scrape"):
-            continue
-        print(f"\n--- {name} ---")
-        confs = mod.scrape(session, known_urls=known_urls)
-        print(f"  {name}: {len(confs)} conferences")
-        all_scraped.extend(confs)
+    modules = list(_iter_scraper_modules(selected))
+
+    all_scraped = [
+        conf for _, confs in _run_scrapers(modules, known_urls, known_titles) for conf in confs
+    ]
 
     print(f"\nTotal scraped: {len(all_scraped)}")
 
     # --- Step 2: Deduplicate ---
     print("\n[2/5] Deduplicating...")
     unique_confs = deduplicate(all_scraped, existing_titles=known_titles)
+    # Release the page text of duplicates
+    del all_scraped
 
     # --- Step 3: Classify via OpenAI ---
     print(f"\n[3/5] Classifying {len(unique_confs)} new conferences via OpenAI...")
     new_conferences = []
 
-    for i, conf in enumerate(unique_confs, 1):
-        title = conf["title"]
-        page_text = conf.get("page_text", "")
-        print(f"  [{i}/{len(unique_confs)}] {title[:60]}")
-
-        if not page_text:
-            print(f"    -> No page text, skipping")
+    exclude_re = _topic_regex(exclude_topics)
+    include_re = _topic_regex(include_topics)
+    to_classify = []
+    for conf in unique_confs:
+        if not conf.get("page_text", ""):
+            print(f"  No page text, skipping: {conf['title'][:60]}")
             continue
-
-        # If filtering, check relevance first (cheap call)
-        if filtering:
-            print(f"    -> Checking relevance...")
-            relevant, reason, detected_topics = check_relevance(
-                title, page_text, include_topics, exclude_topics
-            )
-            if debug:
-                decision = "INCLUDE" if relevant else "EXCLUDE"
-                print(f"    [DEBUG] {decision}: {reason}")
-                print(f"    [DEBUG] Detected topics: {detected_topics}")
-            if not relevant:
-                print(f"    -> Not relevant, skipping")
-                excluded_reasons.append((title, f"not relevant: {reason}"))
-                continue
-
-        # Extract structured fields
-        print(f"    -> Extracting details...")
-        extracted = extract_with_openai(title, page_text)
-
-        # Post-process: skip conferences with expired/closed deadlines
-        sub_dl = extracted.get("submission_deadline", "")
-        dl_date = extracted.get("deadline_date", "")
-        _expired = re.compile(r"expired|passed|closed", re.IGNORECASE)
-        if _expired.search(sub_dl) or _expired.search(dl_date):
-            print(f"    -> Deadline expired/closed, skipping")
-            excluded_reasons.append((title, "deadline expired/closed"))
+        # A page whose every year is in the past describes a past edition;
+        # pages with no year at all still go to OpenAI
+        years = _YEAR_RE.findall(conf["page_text"])
+        if years and max(map(int, years)) < TODAY.year:
+            print(f"  Only past years on page, skipping: {conf['title'][:60]}")
+            excluded_reasons.append((conf["title"], "no current or future year in text"))
             continue
-
-        # Clear non-date placeholders but keep the conference (user checks manually)
-        _placeholder = re.compile(r"tba|to be announced|n/a", re.IGNORECASE)
-        if _placeholder.search(sub_dl):
-            sub_dl = ""
-        if _placeholder.search(dl_date):
-            dl_date = ""
-
-        deadline_date = parse_deadline_date(dl_date)
-
-        new_conf = {
-            "title": title,
-            "url": conf["url"],
-            "submission_deadline": sub_dl,
-            "deadline_date": deadline_date,
-            "conference_dates": extracted.get("conference_dates", ""),
-            "location": extracted.get("location", ""),
-            "keynote_speakers": extracted.get("keynote_speakers", ""),
-            "description": extracted.get("description", ""),
-            "topics": extracted.get("topics", ""),
-        }
-        new_conferences.append(new_conf)
-        time.sleep(0.5)
+        # Titles naming an excluded topic (and no included one) are settled
+        # locally, without spending an OpenAI call
+        m = exclude_re.search(conf["title"]) if exclude_re else None
+        if m and not (include_re and include_re.search(conf["title"])):
+            print(f"  Title matches excluded topic '{m.group()}', skipping: {conf['title'][:60]}")
+            excluded_reasons.append((conf["title"], f"excluded topic in title: {m.group()}"))
+            continue
+        to_classify.append(conf)
+
+    results = asyncio.run(classify_conferences(
+        to_classify,
+        include_topics,
+        exclude_topics,
+        batch_size=args.batch_size,
+        max_concurrent=args.concurrency,
+        semantic_cache=args.semantic_cache,
+        use_cache=not args.no_cache,
+        use_batch_api=args.batch,
+    ))
+
+    # Results are already in, so the per-conference report is collected in
+    # memory and written once rather than printed (and flushed) line by line
+    report = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(report):
+            for i, (conf, (relevance, extracted)) in enumerate(zip(to_classify, results), 1):
+                # Page text is only needed by OpenAI; free it as each result is used
+                conf.pop("page_text", None)
+                title = conf["title"]
+                print(f"  [{i}/{len(to_classify)}] {title[:60]}")
+
+                # If filtering, relevance was decided in the same call as extraction
+                if relevance is not None:
+                    relevant, reason, detected_topics = relevance
+                    if debug:
+                        decision = "INCLUDE" if relevant else "EXCLUDE"
+                        print(f"    [DEBUG] {decision}: {reason}")
+                        print(f"    [DEBUG] Detected topics: {detected_topics}")
+                    if not relevant:
+                        print(f"    -> Not relevant, skipping")
+                        excluded_reasons.append((title, f"not relevant: {reason}"))
+                        continue
+
+                # Post-process: skip conferences with expired/closed deadlines
+                sub_dl = extracted.get("submission_deadline", "")
+                dl_date = extracted.get("deadline_date", "")
+                if _EXPIRED_RE.search(sub_dl) or _EXPIRED_RE.search(dl_date):
+                    print(f"    -> Deadline expired/closed, skipping")
+                    excluded_reasons.append((title, "deadline expired/closed"))
+                    continue
+
+                # Clear non-date placeholders but keep the conference (user checks manually)
+                if _PLACEHOLDER_RE.search(sub_dl):
+                    sub_dl = ""
+                if _PLACEHOLDER_RE.search(dl_date):
+                    dl_date = ""
+
+                deadline_date = parse_deadline_date(dl_date)
+
+                new_conf = {
+                    "title": title,
+                    "url": conf["url"],
+                    "submission_deadline": sub_dl,
+                    "deadline_date": deadline_date,
+                    "conference_dates": extracted.get("conference_dates", ""),
+                    "location": extracted.get("location", ""),
+                    "keynote_speakers": extracted.get("keynote_speakers", ""),
+                    "description": extracted.get("description", ""),
+                    "topics": extracted.get("topics", ""),
+                }
+                new_conferences.append(new_conf)
+    finally:
+        sys.stdout.write(report.getvalue())
 
     print(f"\n  Classified: {len(new_conferences)} new conferences")
+    if openai_usage["requests"]:
+        print(
+            f"  OpenAI: {openai_usage['requests']} requests, "
+            f"{openai_usage['prompt_tokens']} prompt tokens "
+            f"({openai_usage['cached_tokens']} served from prompt cache)"
+        )
 
     # --- Step 4: Filter by deadline ---
     print("\n[4/5] Filtering by deadline...")
     filtered_new = []
 
     for conf in new_conferences:
-        dl = conf.get("deadline_date")
-        if dl and not isinstance(dl, str) and dl < TODAY:
+        dl = _deadline_or_none(conf)
+        if dl and dl < TODAY:
             excluded_reasons.append((conf["title"], "deadline passed"))
             newly_past.append(conf)
             continue
@@ -259,63 +456,13 @@ def main():
     all_active = still_active + filtered_new
 
     # Final title-based dedup (in case OpenAI returned slightly different titles)
-    deduped = []
-    for conf in all_active:
-        norm = normalize_title(conf["title"])
-        is_dup = False
-        for j, existing_conf in enumerate(deduped):
-            existing_norm = normalize_title(existing_conf["title"])
-            shorter = min(len(norm), len(existing_norm))
-            if shorter >= 15 and (
-                norm.startswith(existing_norm[:shorter])
-                or existing_norm.startswith(norm[:shorter])
-            ):
-                is_dup = True
-                dl_new = conf.get("deadline_date")
-                dl_old = existing_conf.get("deadline_date")
-                if dl_new and not dl_old:
-                    deduped[j] = conf
-                elif len(conf.get("description", "")) > len(
-                    existing_conf.get("description", "")
-                ):
-                    deduped[j] = conf
-                break
-        if not is_dup:
-            deduped.append(conf)
-
-    all_active = deduped
+    all_active = merge_title_duplicates(all_active)
 
     # Sort: conferences with known deadlines first (by date), then those without
-    with_deadline = [
-        c for c in all_active
-        if c.get("deadline_date") and not isinstance(c["deadline_date"], str)
-    ]
-    without_deadline = [
-        c for c in all_active
-        if not c.get("deadline_date") or isinstance(c["deadline_date"], str)
-    ]
-    with_deadline.sort(key=lambda c: c["deadline_date"])
-    final_active = with_deadline + without_deadline
+    final_active = sorted(all_active, key=_deadline_sort_key)
 
     # Rebuild past list
-    all_past = existing_past + newly_past
-    all_past_with_dl = [
-        c for c in all_past
-        if c.get("deadline_date") and not isinstance(c["deadline_date"], str)
-    ]
-    all_past_no_dl = [
-        c for c in all_past
-        if not c.get("deadline_date") or isinstance(c["deadline_date"], str)
-    ]
-    all_past_with_dl.sort(key=lambda c: c["deadline_date"], reverse=True)
-    seen_past = set()
-    unique_past = []
-    for c in all_past_with_dl + all_past_no_dl:
-        tn = normalize_title(c["title"])
-        if tn not in seen_past:
-            seen_past.add(tn)
-            unique_past.append(c)
-    final_past = unique_past[:10]
+    final_past = _recent_unique_past(chain(existing_past, newly_past))
 
     print(f"  Active: {len(final_active)} conferences")
     print(f"  Past (kept): {len(final_past)} conferences")
@@ -326,12 +473,15 @@ def main():
             print(f"    - {title[:70]} [{reason}]")
 
     # --- Step 5: Write to Excel ---
-    print(f"\n[5/5] Writing {len(final_active)} active + {len(final_past)} past conferences...")
-    write_to_excel(final_active, final_past)
+    if workbook_is_current(final_active, final_past, existing_active, existing_past):
+        print("\n[5/5] No changes; leaving the Excel file as it is")
+    else:
+        print(f"\n[5/5] Writing {len(final_active)} active + {len(final_past)} past conferences...")
+        write_to_excel(final_active, final_past)
 
     print("\nDone!")
     print(f"  Active:  {len(final_active)} conferences")
-    print(f"  Past:    {len(final_past)} conferences (10 most recent)")
+    print(f"  Past:    {len(final_past)} conferences ({MAX_PAST} most recent)")
 
 
 if __name__ == "__main__":
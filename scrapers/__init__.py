@@ -0,0 +1,29 @@
+"""Conference scrapers, one module per source, each exposing scrape()."""
+
+# lxml's C parser is much faster than the pure-Python html.parser; it is
+# optional, so fall back to the standard library when it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Characters of page text kept per conference for classification; OpenAI is
+# sent at most 4000 of them
+PAGE_TEXT_CHARS = 5000
+
+
+def text_head(tag, limit):
+    """Return tag.get_text(separator="\n", strip=True)[:limit].
+
+    Stops walking the tag's strings once limit characters are collected,
+    so long comment threads and widgets at the end are never visited.
+    """
+    parts = []
+    total = 0
+    for text in tag.stripped_strings:
+        parts.append(text)
+        total += len(text) + 1
+        if total > limit:
+            break
+    return "\n".join(parts)[:limit]
@@ -1,30 +1,58 @@
 """Scraper for inomics.com conference listings."""
 
 import re
-import time
-from bs4 import BeautifulSoup
+from itertools import count
+from bs4 import BeautifulSoup, SoupStrainer
+
+from http_client import (
+    cached_page,
+    conditional_headers,
+    fetch_all,
+    fetch_pages,
+    get_session,
+    listing_entry,
+    load_listing_cache,
+    save_listing_cache,
+)
+from normalize import normalize_title
+from scrapers import HTML_PARSER, PAGE_TEXT_CHARS, text_head
 
 BASE_URL = "https://inomics.com/top/conferences"
 
+# Anchored at both ends: BeautifulSoup applies attribute patterns with search()
+_CONFERENCE_HREF_RE = re.compile(r"^/conference/[\w-]+-\d+$")
+_BETWEEN_DATES_RE = re.compile(r"Between\s+(.+?)\s+and\s+(.+?)(?:\s+in\s+|$)")
+_POST_BODY_RE = re.compile("post-body")
+# Detail fields and body both live in divs; skip the rest of the page
+_DETAIL_STRAINER = SoupStrainer("div")
 
-def scrape(session, known_urls=None):
+
+def scrape(session=None, known_urls=None, known_titles=None):
     """Scrape all conferences from inomics.com.
 
     Returns list of dicts with keys:
         title, conference_dates, location, url, source, page_text
+
+    Without a session, the calling thread's pooled session is used.
     """
+    session = session or get_session()
     known_urls = known_urls or set()
+    known_titles = known_titles or set()
     entries = _get_listing_entries(session, known_urls)
-    # Only fetch detail pages for new entries
-    new_entries = [e for e in entries if e["url"] not in known_urls]
+    # Only fetch detail pages for new entries; listing titles already in
+    # Excel would be dropped by dedup anyway
+    new_entries = [
+        e for e in entries
+        if e["url"] not in known_urls and normalize_title(e["title"]) not in known_titles
+    ]
     if len(new_entries) < len(entries):
-        print(f"  Skipping {len(entries) - len(new_entries)} already-known URLs")
+        print(f"  Skipping {len(entries) - len(new_entries)} already-known conferences")
     conferences = []
 
-    for i, entry in enumerate(new_entries, 1):
+    pages = fetch_all(_fetch_detail_page, [e["url"] for e in new_entries])
+    for i, (entry, page_text) in enumerate(zip(new_entries, pages), 1):
         print(f"  [{i}/{len(new_entries)}] {entry['title'][:60]}")
 
-        page_text = _fetch_detail_page(session, entry["url"])
         if page_text is None:
             page_text = ""
 
@@ -34,9 +62,8 @@ def scrape(session, known_urls=None):
             "location": entry.get("location", ""),
             "url": entry["url"],
             "source": "inomics",
-            "page_text": page_text[:5000],
+            "page_text": page_text,
         })
-        time.sleep(0.5)
 
     print(f"  Inomics: {len(conferences)} conferences found")
     return conferences
@@ -45,24 +72,44 @@ def scrape(session, known_urls=None):
 def _get_listing_entries(session, known_urls=None):
     """Paginate through listing pages and extract conference entries."""
     known_urls = known_urls or set()
+    listing_cache = load_listing_cache()
+    updated = {}
     all_entries = []
     seen_urls = set()
-    page = 0
 
-    while True:
-        url = f"{BASE_URL}?page={page}"
-        print(f"  Fetching inomics page {page}: {url}")
+    def fetch(session, url):
         try:
-            resp = session.get(url, timeout=60)
-            if resp.status_code == 404:
-                break
-            resp.raise_for_status()
+            resp = session.get(
+                url, timeout=60, headers=conditional_headers(listing_cache.get(url))
+            )
+            if resp.status_code != 404:
+                resp.raise_for_status()
+            return resp
         except Exception as e:
-            print(f"    Error on page {page}: {e}")
+            return e
+
+    def page_url(page):
+        return f"{BASE_URL}?page={page}"
+
+    pages = fetch_pages(fetch, session, map(page_url, count()))
+    for page, resp in enumerate(pages):
+        url = page_url(page)
+        print(f"  Fetching inomics page {page}: {url}")
+        if isinstance(resp, Exception):
+            print(f"    Error on page {page}: {resp}")
+            break
+        if resp.status_code == 404:
             break
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-        entries_on_page = _parse_listing_page(soup)
+        if resp.status_code == 304:
+            entries_on_page = listing_cache[url]["items"]
+            print(f"    Page {page} unchanged since last run")
+        else:
+            soup = BeautifulSoup(resp.text, HTML_PARSER)
+            entries_on_page = _parse_listing_page(soup)
+            entry = listing_entry(resp, entries_on_page)
+            if entry:
+                updated[url] = entry
 
         if not entries_on_page:
             break
@@ -85,8 +132,10 @@ def _get_listing_entries(session, known_urls=None):
             print(f"    All entries on page {page} already known — stopping pagination")
             break
 
-        page += 1
-        time.sleep(1)
+    # Cancel prefetches past the page pagination stopped at
+    pages.close()
+    if updated:
+        save_listing_cache(updated)
 
     print(f"  Total unique inomics entries: {len(all_entries)}")
     return all_entries
@@ -97,10 +146,8 @@ def _parse_listing_page(soup):
     entries = []
 
     # Find all conference links (both featured and regular listings)
-    for a_tag in soup.find_all("a", href=True):
-        href = a_tag.get("href", "")
-        if not re.match(r"/conference/[\w-]+-\d+$", href):
-            continue
+    for a_tag in soup.find_all("a", href=_CONFERENCE_HREF_RE):
+        href = a_tag["href"]
 
         # Skip if this is a tiny navigation link (not a listing entry)
         h2 = a_tag.find("h2")
@@ -118,9 +165,7 @@ def _parse_listing_page(soup):
         if info_span:
             # Dates: "Between <bold>15 May</bold> and <bold>16 May</bold>"
             info_text = info_span.get_text(separator=" ", strip=True)
-            date_match = re.search(
-                r"Between\s+(.+?)\s+and\s+(.+?)(?:\s+in\s+|$)", info_text
-            )
+            date_match = _BETWEEN_DATES_RE.search(info_text)
             if date_match:
                 dates = f"{date_match.group(1).strip()} - {date_match.group(2).strip()}"
 
@@ -139,16 +184,13 @@ def _parse_listing_page(soup):
     return entries
 
 
-def _fetch_detail_page(session, url):
-    """Fetch an inomics detail page and return its text content."""
-    try:
-        resp = session.get(url, timeout=60)
-        resp.raise_for_status()
-    except Exception as e:
-        print(f"    Error fetching {url}: {e}")
-        return None
+@cached_page()
+def _fetch_detail_page(html):
+    """Parse an inomics detail page into its text content.
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    Called as _fetch_detail_page(session, url); cached_page does the fetch.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_DETAIL_STRAINER)
 
     # Get structured fields from post-details
     details = {}
@@ -163,12 +205,10 @@ def _fetch_detail_page(session, url):
                 details[key] = val
 
     # Get the main body content
-    post_body = soup.find("div", class_=lambda c: c and "post-body" in " ".join(
-        c if isinstance(c, list) else [c]
-    ))
+    post_body = soup.find("div", class_=_POST_BODY_RE)
     body_text = ""
     if post_body:
-        body_text = post_body.get_text(separator="\n", strip=True)
+        body_text = text_head(post_body, PAGE_TEXT_CHARS)
 
     # Combine all structured details + body text
     parts = []
@@ -177,4 +217,6 @@ def _fetch_detail_page(session, url):
     if body_text:
         parts.append(body_text)
 
-    return "\n".join(parts) if parts else None
+    # Trimmed here, so the page cache and the pending results hold only
+    # the text that is kept
+    return "\n".join(parts)[:PAGE_TEXT_CHARS] if parts else None
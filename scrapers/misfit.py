@@ -1,33 +1,105 @@
 """Scraper for theeconomicmisfit.com conference listings."""
 
+import hashlib
 import re
-import time
-from bs4 import BeautifulSoup
+from itertools import count
+from bs4 import BeautifulSoup, SoupStrainer
+
+from http_client import (
+    cached_page,
+    conditional_headers,
+    fetch_all,
+    fetch_pages,
+    get_session,
+    listing_entry,
+    load_listing_cache,
+    save_listing_cache,
+)
+from normalize import normalize_title
+from scrapers import HTML_PARSER, PAGE_TEXT_CHARS, text_head
 
 BASE_URL = "https://theeconomicmisfit.com/category/conferences/"
 
+# Conference post URLs in anchor hrefs; the listing page is scanned with this
+# directly instead of being parsed into a tree. Comments are matched by the
+# first branch (with an empty group) so links inside them are skipped, and
+# href must follow whitespace so data-href and similar attributes don't count.
+_CONFERENCE_LINK_RE = re.compile(
+    r"""<!--.*?-->"""
+    r"""|<a(?:\s[^>]*?)?\shref\s*=\s*["']?"""
+    r"""(https://theeconomicmisfit\.com/\d{4}/\d{2}/\d{2}/[\w-]+/?)(?=["'\s>])""",
+    re.IGNORECASE | re.DOTALL,
+)
+_TITLE_CLASS_RE = re.compile("title")
+_ENTRY_CONTENT_RE = re.compile("entry-content")
+_POST_CONTENT_RE = re.compile("post-content")
+_WHITESPACE_RE = re.compile(r"\s+")
+# Characters of page text searched for dates and location; the labelled
+# fields sit near the top of a post, and long comment threads below them
+# would otherwise be scanned once per pattern
+_EXTRACT_SCAN_CHARS = 20000
+# Tried in order; the first match wins.
+# Dates like "Date: September 4-5, 2026" or "September 4-5, 2026"
+_DATE_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(?:Date|Conference date|When)[:\s]*(.+?\d{4})",
+        r"(\w+ \d{1,2}[-–]\d{1,2},?\s*\d{4})",
+        r"(\w+ \d{1,2},?\s*\d{4}\s*[-–]\s*\w+ \d{1,2},?\s*\d{4})",
+        r"(\d{1,2}[-–]\d{1,2}\s+\w+\s+\d{4})",
+    )
+)
+_LOCATION_PATTERNS = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"(?:Location|Venue|Where|Place)[:\s]*(.+?)(?:\n|$)",
+        r"(?:held (?:in|at))\s+(.+?)(?:\n|\.|$)",
+    )
+)
+# Conference pages only need the title and content tags; skip nav and sidebars
+_PAGE_STRAINER = SoupStrainer(["h1", "h2", "div", "article"])
 
-def scrape(session, known_urls=None):
+
+def scrape(session=None, known_urls=None, known_titles=None):
     """Scrape all conferences from theeconomicmisfit.com.
 
     Returns list of dicts with keys:
         title, conference_dates, location, url, source, page_text
+
+    Without a session, the calling thread's pooled session is used.
     """
+    session = session or get_session()
     known_urls = known_urls or set()
+    known_titles = known_titles or set()
     links = _get_all_conference_links(session, known_urls)
-    # Skip detail fetch for already-known URLs
-    new_links = [l for l in links if l not in known_urls]
+    # Skip detail fetch for already-known URLs, and for posts whose URL slug
+    # spells a title already in Excel (dedup would drop them anyway)
+    new_links = [
+        l for l in links
+        if l not in known_urls and normalize_title(l.rstrip("/").rsplit("/", 1)[-1]) not in known_titles
+    ]
     if len(new_links) < len(links):
-        print(f"  Skipping {len(links) - len(new_links)} already-known URLs")
+        print(f"  Skipping {len(links) - len(new_links)} already-known conferences")
     conferences = []
-    for i, link in enumerate(new_links, 1):
-        slug = link.split("/")[-2][:60]
+    # Digests of page bodies seen so far; a re-posted article is skipped
+    # before it reaches dedup and classification
+    seen_bodies = set()
+    pages = fetch_all(_fetch_page_text, new_links)
+    for i, (link, (title, page_text)) in enumerate(zip(new_links, pages), 1):
+        slug = link.rstrip("/").rsplit("/", 1)[-1][:60]
         print(f"  [{i}/{len(new_links)}] {slug}")
 
-        title, page_text = _fetch_page_text(session, link)
         if not title or not page_text:
             continue
 
+        digest = hashlib.sha1(
+            _WHITESPACE_RE.sub(" ", page_text.lower()).encode()
+        ).digest()
+        if digest in seen_bodies:
+            print(f"    Same text as an earlier post, skipping")
+            continue
+        seen_bodies.add(digest)
+
         # Lightweight regex extraction for dedup (dates + location)
         dates = _extract_dates_from_text(page_text)
         location = _extract_location_from_text(page_text)
@@ -38,9 +110,8 @@ def scrape(session, known_urls=None):
             "location": location,
             "url": link,
             "source": "misfit",
-            "page_text": page_text[:5000],
+            "page_text": page_text[:PAGE_TEXT_CHARS],
         })
-        time.sleep(0.5)
 
     print(f"  Misfit: {len(conferences)} conferences found")
     return conferences
@@ -49,36 +120,44 @@ def scrape(session, known_urls=None):
 def _get_all_conference_links(session, known_urls=None):
     """Paginate through all listing pages and collect conference URLs."""
     known_urls = known_urls or set()
+    listing_cache = load_listing_cache()
+    updated = {}
     all_links = []
-    page = 1
-    while True:
-        url = BASE_URL if page == 1 else f"{BASE_URL}page/{page}/"
-        print(f"  Fetching listing page {page}: {url}")
+
+    def fetch(session, url):
+        # Revalidate pages seen on earlier runs; unchanged ones return 304.
+        # The session's adapter already retries with exponential backoff.
         try:
-            resp = session.get(url, timeout=60)
-            if resp.status_code == 404:
-                break
-            resp.raise_for_status()
+            resp = session.get(
+                url, timeout=60, headers=conditional_headers(listing_cache.get(url))
+            )
+            if resp.status_code != 404:
+                resp.raise_for_status()
+            return resp
         except Exception as e:
-            print(f"    Error on page {page}: {e}")
-            if page > 1:
-                time.sleep(5)
-                try:
-                    resp = session.get(url, timeout=90)
-                    resp.raise_for_status()
-                except Exception:
-                    break
-            else:
-                break
-
-        soup = BeautifulSoup(resp.text, "html.parser")
-        links_found = set()
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            if re.match(
-                r"https://theeconomicmisfit\.com/\d{4}/\d{2}/\d{2}/[\w-]+/?$", href
-            ):
-                links_found.add(href)
+            return e
+
+    def page_url(page):
+        return BASE_URL if page == 1 else f"{BASE_URL}page/{page}/"
+
+    pages = fetch_pages(fetch, session, map(page_url, count(1)))
+    for page, resp in enumerate(pages, 1):
+        url = page_url(page)
+        print(f"  Fetching listing page {page}: {url}")
+        if isinstance(resp, Exception):
+            print(f"    Error on page {page}: {resp}")
+            break
+        if resp.status_code == 404:
+            break
+
+        if resp.status_code == 304:
+            links_found = set(listing_cache[url]["items"])
+            print(f"    Page {page} unchanged since last run")
+        else:
+            links_found = _listing_links(resp.text)
+            entry = listing_entry(resp, sorted(links_found))
+            if entry:
+                updated[url] = entry
 
         if not links_found:
             break
@@ -91,59 +170,54 @@ def _get_all_conference_links(session, known_urls=None):
             print(f"    All links on page {page} already known — stopping pagination")
             break
 
-        page += 1
-        time.sleep(1)
+    # Cancel prefetches past the page pagination stopped at
+    pages.close()
+    if updated:
+        save_listing_cache(updated)
 
     # Deduplicate while preserving order
-    seen = set()
-    unique = []
-    for link in all_links:
-        if link not in seen:
-            seen.add(link)
-            unique.append(link)
+    unique = list(dict.fromkeys(all_links))
 
     print(f"  Total unique misfit links: {len(unique)}")
     return unique
 
 
-def _fetch_page_text(session, url):
-    """Fetch a conference page and return (title, full_text)."""
-    try:
-        resp = session.get(url, timeout=60)
-        resp.raise_for_status()
-    except Exception as e:
-        print(f"    Error fetching {url}: {e}")
-        return None, None
+def _listing_links(html):
+    """Return the set of conference post URLs linked from a listing page."""
+    links = set(_CONFERENCE_LINK_RE.findall(html))
+    links.discard("")  # comment matches
+    return links
+
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+@cached_page(failed=(None, None))
+def _fetch_page_text(html):
+    """Parse a conference page into (title, full_text).
+
+    Called as _fetch_page_text(session, url); cached_page does the fetch.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_PAGE_STRAINER)
 
-    title_tag = soup.find("h1") or soup.find("h2", class_=re.compile("title"))
+    title_tag = soup.find("h1") or soup.find("h2", class_=_TITLE_CLASS_RE)
     title = title_tag.get_text(strip=True) if title_tag else ""
 
     content_div = (
-        soup.find("div", class_=re.compile("entry-content"))
-        or soup.find("div", class_=re.compile("post-content"))
+        soup.find("div", class_=_ENTRY_CONTENT_RE)
+        or soup.find("div", class_=_POST_CONTENT_RE)
         or soup.find("article")
     )
 
     if not content_div:
         return title, None
 
-    full_text = content_div.get_text(separator="\n", strip=True)
-    return title, full_text
+    # Nothing past the extraction window is read, so it is not kept (or cached)
+    return title, text_head(content_div, _EXTRACT_SCAN_CHARS)
 
 
 def _extract_dates_from_text(text):
     """Lightweight regex to pull conference dates from page text."""
-    # Look for patterns like "Date: September 4-5, 2026" or "September 4-5, 2026"
-    patterns = [
-        r"(?:Date|Conference date|When)[:\s]*(.+?\d{4})",
-        r"(\w+ \d{1,2}[-–]\d{1,2},?\s*\d{4})",
-        r"(\w+ \d{1,2},?\s*\d{4}\s*[-–]\s*\w+ \d{1,2},?\s*\d{4})",
-        r"(\d{1,2}[-–]\d{1,2}\s+\w+\s+\d{4})",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    text = text[:_EXTRACT_SCAN_CHARS]
+    for pattern in _DATE_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group(1).strip()
     return ""
@@ -151,12 +225,9 @@ def _extract_dates_from_text(text):
 
 def _extract_location_from_text(text):
     """Lightweight regex to pull location from page text."""
-    patterns = [
-        r"(?:Location|Venue|Where|Place)[:\s]*(.+?)(?:\n|$)",
-        r"(?:held (?:in|at))\s+(.+?)(?:\n|\.|$)",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    text = text[:_EXTRACT_SCAN_CHARS]
+    for pattern in _LOCATION_PATTERNS:
+        match = pattern.search(text)
         if match:
             loc = match.group(1).strip()
             # Clean up — take first line only, max 100 chars
@@ -0,0 +1,63 @@
+"""Listing-page link extraction for the misfit scraper.
+
+Run from the repository root with: python -m unittest discover tests
+"""
+
+import re
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scrapers.misfit import _listing_links
+
+POST = "https://theeconomicmisfit.com/2026/{:02d}/01/conference-{}/"
+
+LISTING_PAGE = f"""<html><head>
+<link rel="canonical" href="https://theeconomicmisfit.com/category/conferences/">
+<meta property="og:url" content="{POST.format(1, 'meta')}">
+</head><body>
+<a href="{POST.format(2, 'plain')}">Plain</a>
+<A HREF="{POST.format(3, 'upper')}">Upper-case tag and attribute</A>
+<a href = "{POST.format(4, 'spaced')}">Spaces around =</a>
+<a class="more-link" rel="bookmark"
+   href='{POST.format(5, 'single-quoted')}'>Other attributes first, single quotes</a>
+<a href={POST.format(6, 'unquoted')}>Unquoted</a>
+<a href="https://theeconomicmisfit.com/2026/07/01/no-slash">No trailing slash</a>
+<a data-href="{POST.format(8, 'data-attr')}">data-href only</a>
+<a data-href="{POST.format(8, 'data-attr')}" href="{POST.format(9, 'after-data')}">Both</a>
+<!-- <a href="{POST.format(10, 'commented')}">Commented out</a> -->
+<a href="{POST.format(2, 'plain')}#comments">Fragment</a>
+<a href="https://theeconomicmisfit.com/category/conferences/page/2/">Next</a>
+<abbr href="{POST.format(11, 'abbr')}">Not an anchor</abbr>
+<script>var u = "{POST.format(12, 'script')}";</script>
+</body></html>"""
+
+EXPECTED = {
+    POST.format(2, "plain"),
+    POST.format(3, "upper"),
+    POST.format(4, "spaced"),
+    POST.format(5, "single-quoted"),
+    POST.format(6, "unquoted"),
+    "https://theeconomicmisfit.com/2026/07/01/no-slash",
+    POST.format(9, "after-data"),
+}
+
+# The tree-based lookup the regex scan replaced
+_HREF_RE = re.compile(r"^https://theeconomicmisfit\.com/\d{4}/\d{2}/\d{2}/[\w-]+/?$")
+
+
+class ListingLinksTest(unittest.TestCase):
+    def test_expected_links(self):
+        self.assertEqual(_listing_links(LISTING_PAGE), EXPECTED)
+
+    def test_matches_parsed_anchor_hrefs(self):
+        soup = BeautifulSoup(LISTING_PAGE, "html.parser")
+        parsed = {a["href"] for a in soup.find_all("a", href=_HREF_RE)}
+        self.assertEqual(_listing_links(LISTING_PAGE), parsed)
+
+    def test_page_without_posts(self):
+        self.assertEqual(_listing_links("<html><body><!-- --></body></html>"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()